@@ -1,28 +1,51 @@
 # FastAPI Backend API for Meal Planner
 # File: backend/src/api.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Union
-import json
-import pandas as pd
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional, Dict, Tuple, Union
+import asyncio
+from bisect import bisect_right
+import diskcache
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import logging
 import os
+import time
 
-# Import AI model dependencies
-from transformers import pipeline
 from calorie_splitter import split_calories
-from dish_filter import find_best_dish, DishFilter
-from new_prompt_builder import build_prompt
+from config import MENU_PATH
+from dish_filter import DishFilter
+from new_prompt_builder import build_prompt, build_user_profile
+from text_generator import (
+    AI_MODEL_NAME,
+    DescriptionCache,
+    load_generator,
+    warm_up_generator,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# On-disk store of AI meal descriptions, reused across restarts and workers
+DESCRIPTION_CACHE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", ".cache", "ai_desc"
+)
+
+# Maximum number of built prompts kept in memory
+PROMPT_CACHE_SIZE = 8192
+
 # Initialize FastAPI app
-app = FastAPI(title="Meal Planner API", version="1.0.0")
+app = FastAPI(
+    title="Meal Planner API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -39,74 +62,88 @@ app.add_middleware(
 )
 
 
+# Allowed values for enumerated user inputs
+Gender = Literal["Male", "Female", "Other"]
+RegionName = Literal["north", "south"]
+PrimaryGoal = Literal[
+    "Cardiac",
+    "Diabetes",
+    "Maintenance",
+    "Medical Therapy",
+    "Muscle Gain",
+    "Recovery",
+    "Weight Loss",
+]
+LifestyleType = Literal["active", "athletic", "elderly", "sedentary"]
+DietaryStrictness = Literal[
+    "diabetic-friendly", "gluten-free", "non-vegetarian", "vegan", "vegetarian"
+]
+FlavorPreference = Literal[
+    "aromatic", "creamy", "earthy", "mild", "rich", "spicy", "sweet", "tangy"
+]
+PrepSkillLevel = Literal["beginner", "expert", "intermediate"]
+AffordabilityPreference = Literal["affordable", "expensive", "moderate"]
+
+VALID_ALLERGIES = frozenset(
+    {"dairy", "eggs", "fish", "gluten", "mustard", "nuts", "tree nuts"}
+)
+VALID_MEAL_TIMES = frozenset({"afternoon", "evening", "morning", "night", "snacks"})
+VALID_PERSONA_TAGS = frozenset(
+    {
+        "budget-conscious",
+        "dairy-free",
+        "elderly-friendly",
+        "fitness-focused",
+        "general",
+        "health-focused",
+        "muscle-gain",
+        "quick-meal",
+        "vegetarian-friendly",
+        "weight-loss-friendly",
+    }
+)
+
+
 # Enhanced Pydantic models with better validation
 class UserInputData(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     age: int = Field(..., ge=14, le=75)
-    gender: str = Field(..., pattern="^(Male|Female|Other)$")
+    gender: Gender
     height_cm: int = Field(..., ge=120, le=225)
     weight_kg: float = Field(..., ge=40, le=120)
-    Region: str = Field(..., pattern="^(north|south)$")
-    primary_goal: str = Field(
-        ...,
-        pattern="^(Cardiac|Diabetes|Maintenance|Medical Therapy|Muscle Gain|Recovery|Weight Loss)$",
-    )
-    lifestyle_type: str = Field(..., pattern="^(active|athletic|elderly|sedentary)$")
-    dietary_strictness: str = Field(
-        ..., pattern="^(diabetic-friendly|gluten-free|non-vegetarian|vegan|vegetarian)$"
-    )
+    Region: RegionName
+    primary_goal: PrimaryGoal
+    lifestyle_type: LifestyleType
+    dietary_strictness: DietaryStrictness
     known_allergies: List[str] = []
     preferred_meal_times: List[str] = []
-    flavor_preferences: str = Field(
-        ..., pattern="^(aromatic|creamy|earthy|mild|rich|spicy|sweet|tangy)$"
-    )
-    prep_skill_level: str = Field(..., pattern="^(beginner|expert|intermediate)$")
-    affordability_preference: str = Field(
-        ..., pattern="^(affordable|expensive|moderate)$"
-    )
+    flavor_preferences: FlavorPreference
+    prep_skill_level: PrepSkillLevel
+    affordability_preference: AffordabilityPreference
     persona_tags: List[str] = []
 
-    @validator("known_allergies")
+    @field_validator("known_allergies")
+    @classmethod
     def validate_allergies(cls, v):
-        valid_allergies = [
-            "dairy",
-            "eggs",
-            "fish",
-            "gluten",
-            "mustard",
-            "nuts",
-            "tree nuts",
-        ]
-        for allergy in v:
-            if allergy not in valid_allergies:
-                raise ValueError(f"Invalid allergy: {allergy}")
+        if not VALID_ALLERGIES.issuperset(v):
+            allergy = next(a for a in v if a not in VALID_ALLERGIES)
+            raise ValueError(f"Invalid allergy: {allergy}")
         return v
 
-    @validator("preferred_meal_times")
+    @field_validator("preferred_meal_times")
+    @classmethod
     def validate_meal_times(cls, v):
-        valid_times = ["afternoon", "evening", "morning", "night", "snacks"]
-        for time in v:
-            if time not in valid_times:
-                raise ValueError(f"Invalid meal time: {time}")
+        if not VALID_MEAL_TIMES.issuperset(v):
+            time = next(t for t in v if t not in VALID_MEAL_TIMES)
+            raise ValueError(f"Invalid meal time: {time}")
         return v
 
-    @validator("persona_tags")
+    @field_validator("persona_tags")
+    @classmethod
     def validate_persona_tags(cls, v):
-        valid_tags = [
-            "budget-conscious",
-            "dairy-free",
-            "elderly-friendly",
-            "fitness-focused",
-            "general",
-            "health-focused",
-            "muscle-gain",
-            "quick-meal",
-            "vegetarian-friendly",
-            "weight-loss-friendly",
-        ]
-        for tag in v:
-            if tag not in valid_tags:
-                raise ValueError(f"Invalid persona tag: {tag}")
+        if not VALID_PERSONA_TAGS.issuperset(v):
+            tag = next(t for t in v if t not in VALID_PERSONA_TAGS)
+            raise ValueError(f"Invalid persona tag: {tag}")
         return v
 
 
@@ -164,62 +201,177 @@ class MealPlanResponse(BaseModel):
     timestamp: datetime
 
 
+# Lookup tables for metabolic calculations and recommendations
+ACTIVITY_FACTORS = {
+    "sedentary": 1.2,
+    "active": 1.55,
+    "elderly": 1.2,
+    "athletic": 1.725,
+}
+
+# BMI below each threshold maps to the category at the same index
+BMI_THRESHOLDS = (18.5, 25, 30)
+BMI_CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obese")
+
+GOAL_CALORIE_ADJUSTMENTS = {
+    "Weight Loss": 0.85,
+    "Muscle Gain": 1.15,
+    "Maintenance": 1.0,
+    "Recovery": 1.1,
+}
+
+GOAL_RECOMMENDATIONS = {
+    "Weight Loss": "Focus on portion control and nutrient-dense, low-calorie foods",
+    "Muscle Gain": "Emphasize protein-rich foods and adequate caloric intake",
+    "Maintenance": "Balanced macronutrient distribution for sustained energy",
+    "Cardiac": "Heart-healthy foods low in sodium and saturated fats",
+    "Diabetes": "Complex carbohydrates and fiber-rich foods for blood sugar control",
+    "Recovery": "Anti-inflammatory foods and adequate protein for healing",
+}
+
+
+@lru_cache(maxsize=1)
+def _timestamp_for_second(second: int) -> datetime:
+    return datetime.fromtimestamp(second)
+
+
+def coarse_timestamp() -> datetime:
+    """Current time truncated to the second, built at most once per second."""
+    return _timestamp_for_second(int(time.time()))
+
+
+def sum_meal_values(values: Dict[str, int]) -> int:
+    """Sum a per-meal mapping over the fixed breakfast/lunch/dinner/snack slots."""
+    return (
+        values.get("breakfast", 0)
+        + values.get("lunch", 0)
+        + values.get("dinner", 0)
+        + values.get("snack_1", 0)
+        + values.get("snack_2", 0)
+    )
+
+
 # Enhanced MealPlannerService with AI Model Integration and Protein Support
 class AIEnhancedMealPlannerService:
     def __init__(self):
-        self.dishes = self.load_dishes()
-        self.initialize_ai_model()
         self.dish_filter = (
             DishFilter()
         )  # Initialize dish filter for protein calculations
+        self.dishes = self.load_dishes()
+        self.index_dishes()
+        # AI meal descriptions, kept in memory and on disk
+        self.descriptions = DescriptionCache(store=self.open_disk_cache())
+        self._cached_prompt = lru_cache(maxsize=PROMPT_CACHE_SIZE)(
+            self.build_prompt_from_key
+        )
+        # Single worker so blocking model calls never contend for the model
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.initialize_ai_model()
+        self.cache_status_payloads()
 
     def load_dishes(self):
         """Load dishes from JSON file with error handling."""
         try:
-            dishes_path = os.path.join(
-                os.path.dirname(__file__), "..", "dish_library", "menu.json"
-            )
-            with open(dishes_path, "r", encoding="utf-8") as f:
-                dishes_data = json.load(f)
+            with open(MENU_PATH, "rb") as f:
+                dishes_data = orjson.loads(f.read())
                 return dishes_data if isinstance(dishes_data, list) else []
         except FileNotFoundError:
             logger.error("Dishes JSON file not found")
             return []
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("Invalid JSON in dishes file")
             return []
 
+    def index_dishes(self):
+        """Index dishes for vectorized scoring and precompute dish statistics."""
+        self.dish_table = self.dish_filter.build_dish_table(self.dishes)
+        self._dish_by_name = {}
+        stats = {
+            "total_dishes": len(self.dishes),
+            "meal_types": {},
+            "dietary_options": {},
+            "regions": {},
+        }
+
+        for dish in self.dishes:
+            meal_type = dish.get("meal_type", "unknown")
+            self._dish_by_name.setdefault(dish.get("name"), dish)
+
+            # Count by meal type
+            stats["meal_types"][meal_type] = stats["meal_types"].get(meal_type, 0) + 1
+
+            # Count dietary options
+            for diet_tag in dish.get("diet_tags", []):
+                stats["dietary_options"][diet_tag] = (
+                    stats["dietary_options"].get(diet_tag, 0) + 1
+                )
+
+            # Count regions
+            region = dish.get("region", "unknown")
+            stats["regions"][region] = stats["regions"].get(region, 0) + 1
+
+        self._dish_stats = stats
+
+    def cache_status_payloads(self):
+        """Precompute utility endpoint payloads that only change at startup."""
+        self.dish_stats_json = orjson.dumps(
+            {**self._dish_stats, "ai_model_status": self.model_loaded}
+        )
+        self.health_fields = {
+            "dishes_loaded": len(self.dishes),
+            "ai_model_loaded": self.model_loaded,
+            "services": {
+                "dish_filter": "active",
+                "meal_planner": "active",
+                "ai_generator": "active" if self.model_loaded else "unavailable",
+            },
+        }
+        self.model_status_fields = {
+            "model_loaded": self.model_loaded,
+            "model_name": AI_MODEL_NAME,
+            "model_type": "text2text-generation",
+            "status": "active" if self.model_loaded else "failed_to_load",
+        }
+
     def initialize_ai_model(self):
         """Initialize the AI text generation model."""
         try:
-            logger.info("Initializing AI model: MBZUAI/LaMini-Flan-T5-783M")
-            self.generator = pipeline(
-                "text2text-generation",
-                model="MBZUAI/LaMini-Flan-T5-783M",
-                max_new_tokens=150,
-                truncation=True,
-            )
+            logger.info(f"Initializing AI model: {AI_MODEL_NAME}")
+            self.generator = load_generator()
             self.model_loaded = True
             logger.info("AI model successfully loaded")
         except Exception as e:
             logger.error(f"Failed to load AI model: {e}")
             self.generator = None
             self.model_loaded = False
+            return
+
+        self.warm_up_ai_model()
+
+    def warm_up_ai_model(self):
+        """Run throwaway generations so lazy initialization happens at startup."""
+        try:
+            logger.info("Warming up AI model")
+            warm_up_generator(self.generator, self.dishes)
+        except Exception as e:
+            logger.warning(f"AI model warm-up failed: {e}")
 
     def normalize_user_data(self, user_data: Dict) -> Dict:
-        """Normalize user data for meal planning compatibility."""
-        normalized = user_data.copy()
+        """Normalize user data in place for meal planning compatibility."""
+        normalized = user_data
 
-        # Add calculated fields
-        normalized["BMI"] = self.calculate_bmi(
-            user_data["weight_kg"], user_data["height_cm"]
-        )
-        normalized["BMR"] = self.calculate_bmr(
-            user_data["weight_kg"],
-            user_data["height_cm"],
-            user_data["age"],
-            user_data["gender"],
-        )
+        # Add calculated fields unless the caller already computed them
+        if "BMI" not in normalized:
+            normalized["BMI"] = self.calculate_bmi(
+                user_data["weight_kg"], user_data["height_cm"]
+            )
+        if "BMR" not in normalized:
+            normalized["BMR"] = self.calculate_bmr(
+                user_data["weight_kg"],
+                user_data["height_cm"],
+                user_data["age"],
+                user_data["gender"],
+            )
 
         # Add meal frequency if not present
         if "Meal_Frequency" not in normalized:
@@ -246,24 +398,11 @@ class AIEnhancedMealPlannerService:
 
     def get_activity_factor(self, lifestyle_type: str) -> float:
         """Get activity factor based on lifestyle type."""
-        activity_factors = {
-            "sedentary": 1.2,
-            "active": 1.55,
-            "elderly": 1.2,
-            "athletic": 1.725,
-        }
-        return activity_factors.get(lifestyle_type.lower(), 1.2)
+        return ACTIVITY_FACTORS.get(lifestyle_type.lower(), 1.2)
 
     def categorize_bmi(self, bmi: float) -> str:
         """Categorize BMI value."""
-        if bmi < 18.5:
-            return "Underweight"
-        elif bmi < 25:
-            return "Normal weight"
-        elif bmi < 30:
-            return "Overweight"
-        else:
-            return "Obese"
+        return BMI_CATEGORIES[bisect_right(BMI_THRESHOLDS, bmi)]
 
     # NEW: Protein calculation methods
     def calculate_user_protein_target(self, user_data: Dict) -> int:
@@ -274,37 +413,75 @@ class AIEnhancedMealPlannerService:
         self, user_data: Dict, meal_name: str, kcal: int, best_dish: Dict
     ) -> str:
         """Generate AI-powered meal description using the model."""
-        if not self.model_loaded or not self.generator:
-            logger.warning("AI model not available, using fallback description")
-            return self.get_fallback_description(meal_name, best_dish)
+        descriptions = self.generate_ai_meal_descriptions(
+            user_data, [(meal_name, kcal, best_dish)]
+        )
+        return descriptions[meal_name]
 
-        try:
-            # Build prompt using your existing prompt builder
-            prompt = build_prompt(user_data, meal_name, kcal, best_dish)
+    def generate_ai_meal_descriptions(
+        self, user_data: Dict, meals: List[Tuple[str, int, Dict]]
+    ) -> Dict[str, str]:
+        """Generate AI-powered descriptions for several meals in one batched model call."""
+        if not meals:
+            return {}
 
-            logger.info(f"Generating AI meal description for {meal_name}")
-            logger.debug(f"Prompt: {prompt}")
+        if not self.model_loaded or not self.generator:
+            logger.warning("AI model not available, using fallback description")
+            return {
+                meal_name: self.get_fallback_description(meal_name, best_dish)
+                for meal_name, _, best_dish in meals
+            }
 
-            # Generate using AI model
-            model_output = self.generator(prompt)
+        # Serve repeat prompts from the cache and generate the rest in one batch
+        user_profile = build_user_profile(user_data)
+        prompts = {
+            meal_name: self._cached_prompt(
+                self.get_prompt_key(user_profile, meal_name, kcal, best_dish)
+            )
+            for meal_name, kcal, best_dish in meals
+        }
+        descriptions, pending = self.descriptions.lookup(prompts)
+        if descriptions:
+            logger.info(f"Using cached AI descriptions for {', '.join(descriptions)}")
 
-            if not model_output or "generated_text" not in model_output[0]:
-                logger.warning("AI model returned no valid output, using fallback")
-                return self.get_fallback_description(meal_name, best_dish)
+        try:
+            descriptions.update(self.descriptions.generate(self.generator, pending))
+        except Exception as e:
+            logger.error(f"Error in batched AI generation: {e}")
 
-            result = model_output[0]["generated_text"].strip()
+        return {
+            meal_name: descriptions.get(meal_name)
+            or self.get_fallback_description(meal_name, best_dish)
+            for meal_name, _, best_dish in meals
+        }
 
-            # Clean up the result if needed
-            if result:
-                logger.info(f"Successfully generated AI description for {meal_name}")
-                return result
-            else:
-                logger.warning("AI generated empty result, using fallback")
-                return self.get_fallback_description(meal_name, best_dish)
+    def get_prompt_key(
+        self,
+        user_profile: Tuple[str, int],
+        meal_name: str,
+        kcal: int,
+        best_dish: Dict,
+    ) -> tuple:
+        """
+        Build the prompt memo key from the dish, meal and the rendered user
+        block of the prompt (from build_user_profile), which together fix it.
+        """
+        return (best_dish.get("name"), meal_name, kcal, user_profile)
+
+    def build_prompt_from_key(self, prompt_key: tuple) -> str:
+        """Rebuild the prompt for a prompt memo key."""
+        dish_name, meal_name, kcal, user_profile = prompt_key
+        return build_prompt(
+            {}, meal_name, kcal, self._dish_by_name[dish_name], user_profile
+        )
 
+    def open_disk_cache(self):
+        """Open the on-disk description cache shared across restarts and workers."""
+        try:
+            return diskcache.Cache(DESCRIPTION_CACHE_DIR)
         except Exception as e:
-            logger.error(f"Error in AI generation for {meal_name}: {e}")
-            return self.get_fallback_description(meal_name, best_dish)
+            logger.warning(f"Persistent description cache unavailable: {e}")
+            return None
 
     def get_fallback_description(self, meal_name: str, best_dish: Dict) -> str:
         """Get fallback meal description when AI fails."""
@@ -342,17 +519,21 @@ class AIEnhancedMealPlannerService:
             formatted_plan = {}
             actual_calories = {}
             actual_proteins = {}  # NEW: Track protein per meal
+            planned_meals = []  # (meal_name, kcal, best_dish) awaiting descriptions
+
+            # Determine dish types and score every dish once for all meals
+            dish_types = [
+                "snack" if meal_name.startswith("snack") else meal_name
+                for meal_name in meal_calories
+            ]
+            best_dishes = self.dish_table.find_best_dishes(
+                normalized_user_data, dish_types
+            )
 
-            for meal_name, kcal in meal_calories.items():
-                # Determine dish type
-                dish_type = "snack" if meal_name.startswith("snack") else meal_name
-
-                # Filter dishes by type
-                filtered_dishes = [
-                    dish for dish in self.dishes if dish.get("meal_type") == dish_type
-                ]
-
-                if not filtered_dishes:
+            for (meal_name, kcal), dish_type, best_dish in zip(
+                meal_calories.items(), dish_types, best_dishes
+            ):
+                if not len(self.dish_table.rows_for_meal_type(dish_type)):
                     logger.warning(f"No dishes found for {dish_type}")
                     formatted_plan[meal_name] = (
                         f"No suitable {meal_name.replace('_', ' ')} available"
@@ -361,9 +542,6 @@ class AIEnhancedMealPlannerService:
                     actual_proteins[meal_name] = 0  # NEW
                     continue
 
-                # Find best dish using your existing filter
-                best_dish = find_best_dish(filtered_dishes, normalized_user_data)
-
                 if not best_dish:
                     formatted_plan[meal_name] = (
                         f"No suitable {meal_name.replace('_', ' ')} found for your preferences"
@@ -372,27 +550,19 @@ class AIEnhancedMealPlannerService:
                     actual_proteins[meal_name] = 0  # NEW
                     continue
 
-                # Handle case where find_best_dish returns a list
-                if isinstance(best_dish, list):
-                    best_dish = best_dish[0] if best_dish else None
-
-                if not best_dish:
-                    formatted_plan[meal_name] = (
-                        f"No suitable {meal_name.replace('_', ' ')} found"
-                    )
-                    actual_calories[meal_name] = 0
-                    actual_proteins[meal_name] = 0  # NEW
-                    continue
-
-                # Generate AI-powered meal description
-                ai_description = self.generate_ai_meal_description(
-                    normalized_user_data, meal_name, kcal, best_dish
-                )
-
-                formatted_plan[meal_name] = ai_description
+                # Reserve the slot; descriptions are generated in one batch below
+                formatted_plan[meal_name] = None
                 actual_calories[meal_name] = best_dish.get("calories", kcal)
                 actual_proteins[meal_name] = best_dish.get("protein_grams", 0)  # NEW
+                planned_meals.append((meal_name, kcal, best_dish))
 
+            # Generate AI-powered meal descriptions for all meals at once
+            ai_descriptions = self.generate_ai_meal_descriptions(
+                normalized_user_data, planned_meals
+            )
+
+            for meal_name, ai_description in ai_descriptions.items():
+                formatted_plan[meal_name] = ai_description
                 logger.info(
                     f"Generated {meal_name}: {ai_description[:100]}... (Protein: {actual_proteins[meal_name]}g)"
                 )
@@ -433,7 +603,7 @@ class AIEnhancedMealPlannerService:
         self, user_data: Dict, meal_calories: Dict[str, int]
     ) -> Dict[str, str]:
         """Generate nutritional summary and recommendations."""
-        total_calories = sum(meal_calories.values())
+        total_calories = sum_meal_values(meal_calories)
         primary_goal = user_data.get("primary_goal", "")
 
         summary = {
@@ -450,15 +620,7 @@ class AIEnhancedMealPlannerService:
 
     def get_goal_recommendation(self, goal: str) -> str:
         """Get recommendation based on primary goal."""
-        recommendations = {
-            "Weight Loss": "Focus on portion control and nutrient-dense, low-calorie foods",
-            "Muscle Gain": "Emphasize protein-rich foods and adequate caloric intake",
-            "Maintenance": "Balanced macronutrient distribution for sustained energy",
-            "Cardiac": "Heart-healthy foods low in sodium and saturated fats",
-            "Diabetes": "Complex carbohydrates and fiber-rich foods for blood sugar control",
-            "Recovery": "Anti-inflammatory foods and adequate protein for healing",
-        }
-        return recommendations.get(goal, "Balanced nutrition for overall health")
+        return GOAL_RECOMMENDATIONS.get(goal, "Balanced nutrition for overall health")
 
     def get_dietary_notes(self, user_data: Dict) -> str:
         """Generate dietary notes based on user preferences."""
@@ -487,17 +649,10 @@ meal_service = AIEnhancedMealPlannerService()
 # Health check route with AI model status
 @app.get("/health")
 async def health_check():
-    dish_count = len(meal_service.dishes) if meal_service.dishes else 0
     return {
         "status": "healthy",
-        "timestamp": datetime.now(),
-        "dishes_loaded": dish_count,
-        "ai_model_loaded": meal_service.model_loaded,
-        "services": {
-            "dish_filter": "active",
-            "meal_planner": "active",
-            "ai_generator": "active" if meal_service.model_loaded else "unavailable",
-        },
+        "timestamp": coarse_timestamp(),
+        **meal_service.health_fields,
     }
 
 
@@ -521,14 +676,7 @@ async def generate_meal_plan(user_data: UserInputData):
         caloric_intake = round(bmr * activity_factor)
 
         # Adjust calories based on primary goal
-        goal_adjustments = {
-            "Weight Loss": 0.85,
-            "Muscle Gain": 1.15,
-            "Maintenance": 1.0,
-            "Recovery": 1.1,
-        }
-
-        adjustment = goal_adjustments.get(user_data.primary_goal, 1.0)
+        adjustment = GOAL_CALORIE_ADJUSTMENTS.get(user_data.primary_goal, 1.0)
         adjusted_calories = int(caloric_intake * adjustment)
 
         calculated_data = CalculatedData(
@@ -540,7 +688,7 @@ async def generate_meal_plan(user_data: UserInputData):
         )
 
         # Convert to dict for meal planning
-        user_dict = user_data.dict()
+        user_dict = user_data.model_dump()
         user_dict["Caloric_Intake_kcal_day"] = adjusted_calories
         user_dict["BMI"] = bmi
         user_dict["BMR"] = bmr
@@ -548,9 +696,13 @@ async def generate_meal_plan(user_data: UserInputData):
         # NEW: Calculate user's daily protein target
         daily_protein_target = meal_service.calculate_user_protein_target(user_dict)
 
-        # Generate AI-powered meal plan with protein tracking
-        meal_plan_dict, meal_calories, meal_proteins = meal_service.generate_meal_plan(
-            user_dict, adjusted_calories
+        # Generate AI-powered meal plan off the event loop
+        loop = asyncio.get_running_loop()
+        meal_plan_dict, meal_calories, meal_proteins = await loop.run_in_executor(
+            meal_service.executor,
+            meal_service.generate_meal_plan,
+            user_dict,
+            adjusted_calories,
         )
 
         # Create enhanced meal plan object
@@ -568,8 +720,8 @@ async def generate_meal_plan(user_data: UserInputData):
         )
 
         # Calculate totals
-        total_calories = sum(meal_calories.values())
-        total_protein = sum(meal_proteins.values())
+        total_calories = sum_meal_values(meal_calories)
+        total_protein = sum_meal_values(meal_proteins)
 
         # Enhanced nutritional summary with protein information
         nutritional_summary = meal_service.generate_nutritional_summary(
@@ -599,7 +751,9 @@ async def generate_meal_plan(user_data: UserInputData):
         logger.info(
             f"Successfully generated meal plan for {user_data.name} - Protein: {total_protein}g/{daily_protein_target}g"
         )
-        return response
+        # Returning a response directly skips FastAPI's second validation pass;
+        # response_model above is kept for the OpenAPI schema
+        return ORJSONResponse(response.model_dump())
 
     except Exception as e:
         logger.error(f"Error generating meal plan: {e}")
@@ -620,42 +774,14 @@ async def get_dish_statistics():
     if not meal_service.dishes:
         raise HTTPException(status_code=404, detail="No dishes loaded")
 
-    stats = {
-        "total_dishes": len(meal_service.dishes),
-        "meal_types": {},
-        "dietary_options": {},
-        "regions": {},
-        "ai_model_status": meal_service.model_loaded,
-    }
-
-    for dish in meal_service.dishes:
-        # Count by meal type
-        meal_type = dish.get("meal_type", "unknown")
-        stats["meal_types"][meal_type] = stats["meal_types"].get(meal_type, 0) + 1
-
-        # Count dietary options
-        for diet_tag in dish.get("diet_tags", []):
-            stats["dietary_options"][diet_tag] = (
-                stats["dietary_options"].get(diet_tag, 0) + 1
-            )
-
-        # Count regions
-        region = dish.get("region", "unknown")
-        stats["regions"][region] = stats["regions"].get(region, 0) + 1
-
-    return stats
+    # Dish statistics are static, so they are serialized once at startup
+    return Response(meal_service.dish_stats_json, media_type="application/json")
 
 
 @app.get("/api/model-status")
 async def get_model_status():
     """Get AI model status and information."""
-    return {
-        "model_loaded": meal_service.model_loaded,
-        "model_name": "MBZUAI/LaMini-Flan-T5-783M",
-        "model_type": "text2text-generation",
-        "status": "active" if meal_service.model_loaded else "failed_to_load",
-        "timestamp": datetime.now(),
-    }
+    return {**meal_service.model_status_fields, "timestamp": coarse_timestamp()}
 
 
 if __name__ == "__main__":
@@ -1,3 +1,11 @@
+VALID_MEAL_FREQUENCIES = ("3 meals", "3 meals + 2 snacks")
+
+# Standard share of daily calories for each main meal
+BREAKFAST_PCT = 0.275
+LUNCH_PCT = 0.325
+DINNER_PCT = 0.275
+
+
 def split_calories(total_calories, meal_frequency):
     """
     Splits total daily calories into specified meal frequency.
@@ -11,31 +19,26 @@ def split_calories(total_calories, meal_frequency):
     """
     if not isinstance(total_calories, (int, float)) or total_calories <= 0:
         raise ValueError("Total calories must be a positive number")
-    if meal_frequency not in ["3 meals", "3 meals + 2 snacks"]:
+    if meal_frequency not in VALID_MEAL_FREQUENCIES:
         raise ValueError(
             "Meal frequency must be either '3 meals' or '3 meals + 2 snacks'"
         )
 
-    calorie_distribution = {}
-
-    # Set standard percentages
-    breakfast_pct = 0.275
-    lunch_pct = 0.325
-    dinner_pct = 0.275
-
     # Calculate and round to nearest 10 kcal
-    breakfast_cal = round(total_calories * breakfast_pct / 10) * 10
-    lunch_cal = round(total_calories * lunch_pct / 10) * 10
-    dinner_cal = round(total_calories * dinner_pct / 10) * 10
-
-    calorie_distribution["breakfast"] = breakfast_cal
-    calorie_distribution["lunch"] = lunch_cal
-    calorie_distribution["dinner"] = dinner_cal
-
-    if meal_frequency == "3 meals + 2 snacks":
-        remaining_cal = total_calories - (breakfast_cal + lunch_cal + dinner_cal)
-        snack_cal = round(remaining_cal / 2 / 10) * 10
-        calorie_distribution["snack_1"] = snack_cal
-        calorie_distribution["snack_2"] = snack_cal
-
-    return calorie_distribution
+    breakfast_cal = round(total_calories * BREAKFAST_PCT / 10) * 10
+    lunch_cal = round(total_calories * LUNCH_PCT / 10) * 10
+    dinner_cal = round(total_calories * DINNER_PCT / 10) * 10
+
+    if meal_frequency == "3 meals":
+        return {"breakfast": breakfast_cal, "lunch": lunch_cal, "dinner": dinner_cal}
+
+    remaining_cal = total_calories - (breakfast_cal + lunch_cal + dinner_cal)
+    snack_cal = round(remaining_cal / 2 / 10) * 10
+
+    return {
+        "breakfast": breakfast_cal,
+        "lunch": lunch_cal,
+        "dinner": dinner_cal,
+        "snack_1": snack_cal,
+        "snack_2": snack_cal,
+    }
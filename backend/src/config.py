@@ -0,0 +1,8 @@
+import os
+
+# Dish library read by the API and the standalone meal planner; override with
+# the MENU_PATH environment variable
+MENU_PATH = os.environ.get(
+    "MENU_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "dish_library", "menu.json"),
+)
@@ -2,13 +2,163 @@
 # File: dish_filter.py
 
 import random
-from typing import List, Dict, Union, Optional, Tuple
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Union, Optional, Tuple
 import logging
 
+import numpy as np
+
+import scoring_kernel
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Preferred meal times and the meal type each one maps to
+_MEAL_TYPE_MAPPING: Mapping[str, str] = MappingProxyType(
+    {
+        "morning": "breakfast",
+        "afternoon": "lunch",
+        "evening": "dinner",
+        "night": "dinner",
+        "snacks": "snack",
+    }
+)
+
+# Weight factors for different scoring components
+_SCORE_WEIGHTS: Mapping[str, float] = MappingProxyType(
+    {
+        "attribute_rankings": 1.0,
+        "dietary_match": 2.0,
+        "allergy_penalty": -10.0,
+        "meal_timing": 0.5,
+        "caloric_alignment": 0.3,
+        "persona_bonus": 0.8,
+        "protein_alignment": 1.5,  # NEW: Protein scoring weight
+    }
+)
+
+# Protein requirements based on goals (grams per kg body weight)
+_PROTEIN_REQUIREMENTS: Mapping[str, float] = MappingProxyType(
+    {
+        "muscle gain": 2.2,
+        "weight loss": 1.6,
+        "recovery": 1.8,
+        "cardiac": 1.2,
+        "diabetes": 1.2,
+        "maintenance": 1.0,
+        "medical therapy": 1.4,
+    }
+)
+
+# Protein need multiplier per lifestyle
+_ACTIVITY_MULTIPLIERS: Mapping[str, float] = MappingProxyType(
+    {
+        "athletic": 1.2,
+        "active": 1.1,
+        "sedentary": 1.0,
+        "elderly": 0.9,
+    }
+)
+
+# Typical share of daily calories for each meal type
+_CALORIE_DISTRIBUTION: Mapping[str, float] = MappingProxyType(
+    {
+        "breakfast": 0.25,
+        "lunch": 0.35,
+        "dinner": 0.30,
+        "snack": 0.10,
+    }
+)
+
+# Share of daily protein for each meal type
+_PROTEIN_DISTRIBUTION: Mapping[str, float] = MappingProxyType(
+    {
+        "breakfast": 0.25,
+        "lunch": 0.35,
+        "dinner": 0.30,
+        "snack": 0.05,  # Per snack
+    }
+)
+
+# Frontend field names and the dish attribute each one is ranked by
+_PREFERENCE_FIELDS: Mapping[str, str] = MappingProxyType(
+    {
+        "primary_goal": "health_suitability",
+        "lifestyle_type": "lifestyle_suitability",
+        "dietary_strictness": "dietary_suitability",
+        "flavor_preferences": "flavor_profile",
+        "prep_skill_level": "prep_complexity",
+        "affordability_preference": "ingredient_affordability",
+    }
+)
+
+# Health goals as named in dish health_suitability rankings
+_HEALTH_GOALS: Mapping[str, str] = MappingProxyType(
+    {
+        "weight_loss": "weight loss",
+        "muscle_gain": "muscle gain",
+        "medical_therapy": "medical recovery",
+        "cardiac": "cardiac",
+        "diabetes": "diabetes",
+        "maintenance": "maintenance",
+        "recovery": "recovery",
+    }
+)
+
+# Diet tags that count against a dish for each dietary preference when scoring
+_DIETARY_CONFLICTS: Mapping[str, frozenset] = MappingProxyType(
+    {
+        "vegan": frozenset({"non-vegetarian", "dairy"}),
+        "vegetarian": frozenset({"non-vegetarian"}),
+        "diabetic-friendly": frozenset({"high-sugar", "sweet"}),
+        "gluten-free": frozenset({"gluten"}),
+    }
+)
+
+# Diet tags that rule a dish out entirely for strict dietary preferences
+_STRICT_DIETARY_CONFLICTS: Mapping[str, frozenset] = MappingProxyType(
+    {
+        "vegan": frozenset({"non-vegetarian"}),
+        "vegetarian": frozenset({"non-vegetarian"}),
+    }
+)
+
+# User profile fields as scoring sees them, normalized once per request
+UserContext = namedtuple(
+    "UserContext",
+    "normalized_prefs allergies dietary personas meal_times region daily_protein",
+)
+
+
+# Tag sets of a dish as constraint checks and scoring compare them
+DishTags = namedtuple(
+    "DishTags", "diet_tags allergens personas suitable_times meal_type"
+)
+
+
+def dish_tags(dish: Dict) -> DishTags:
+    """Read a dish's tags into the sets scoring uses, leaving the dish untouched."""
+    return DishTags(
+        diet_tags=frozenset(tag.lower() for tag in dish.get("diet_tags", [])),
+        allergens=frozenset(
+            allergen.lower() for allergen in dish.get("allergy_risks", [])
+        ),
+        personas=frozenset(dish.get("persona_tags", [])),
+        suitable_times=frozenset(dish.get("time_of_day_suitability", [])),
+        meal_type=dish.get("meal_type", "").lower(),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _count_matching_times(user_times: frozenset, dish_times: frozenset) -> int:
+    """Count dish times containing any of the user's preferred meal times."""
+    return sum(
+        1 for dish_time in dish_times if any(t in dish_time.lower() for t in user_times)
+    )
+
 
 class DishFilter:
     """
@@ -16,72 +166,58 @@ class DishFilter:
     using comprehensive scoring and constraint validation, now with protein optimization.
     """
 
+    # Shared read-only configuration
+    meal_type_mapping = _MEAL_TYPE_MAPPING
+    score_weights = _SCORE_WEIGHTS
+    protein_requirements = _PROTEIN_REQUIREMENTS
+
     def __init__(self):
-        self.meal_type_mapping = {
-            "morning": "breakfast",
-            "afternoon": "lunch",
-            "evening": "dinner",
-            "night": "dinner",
-            "snacks": "snack",
-        }
+        # Vectorized view of the dish pool loaded at startup, see build_dish_table
+        self._dish_table = None
 
-        # Weight factors for different scoring components
-        self.score_weights = {
-            "attribute_rankings": 1.0,
-            "dietary_match": 2.0,
-            "allergy_penalty": -10.0,
-            "meal_timing": 0.5,
-            "caloric_alignment": 0.3,
-            "persona_bonus": 0.8,
-            "protein_alignment": 1.5,  # NEW: Protein scoring weight
-        }
+    def build_dish_table(self, dishes: List[Dict]) -> "DishTable":
+        """
+        Build the DishTable for the loaded dish pool, so ranking that pool is
+        vectorized. Call once at load time; the pool must not change in place.
+        """
+        self._dish_table = DishTable(dishes, self)
+        return self._dish_table
 
-        # Protein requirements based on goals (grams per kg body weight)
-        self.protein_requirements = {
-            "muscle gain": 2.2,
-            "weight loss": 1.6,
-            "recovery": 1.8,
-            "cardiac": 1.2,
-            "diabetes": 1.2,
-            "maintenance": 1.0,
-            "medical therapy": 1.4,
-        }
+    def dish_table(self, dishes: List[Dict]) -> Optional["DishTable"]:
+        """Get the prebuilt DishTable for a dish pool, or None if none was built."""
+        table = self._dish_table
+        return table if table is not None and table.dishes is dishes else None
 
     def calculate_user_protein_needs(self, user_data: Dict) -> float:
         """Calculate daily protein needs based on user profile."""
         weight = user_data.get("weight_kg", 70)  # Default fallback
-        goal = user_data.get("primary_goal", "maintenance").lower().replace(" ", "_")
         lifestyle = user_data.get("lifestyle_type", "sedentary").lower()
 
-        # Normalize goal name
-        goal = goal.replace("_", " ")
+        # Normalize goal name ("Weight_Loss" and "Weight Loss" -> "weight loss")
+        goal = user_data.get("primary_goal", "maintenance").lower().replace("_", " ")
 
         # Base protein requirement
         base_protein = self.protein_requirements.get(goal, 1.0) * weight
 
         # Adjust for activity level
-        activity_multipliers = {
-            "athletic": 1.2,
-            "active": 1.1,
-            "sedentary": 1.0,
-            "elderly": 0.9,
-        }
-
-        multiplier = activity_multipliers.get(lifestyle, 1.0)
+        multiplier = _ACTIVITY_MULTIPLIERS.get(lifestyle, 1.0)
         return base_protein * multiplier
 
     def calculate_meal_protein_target(
         self, daily_protein: float, meal_type: str
     ) -> float:
         """Calculate protein target for specific meal type."""
-        protein_distribution = {
-            "breakfast": 0.25,
-            "lunch": 0.35,
-            "dinner": 0.30,
-            "snack": 0.05,  # Per snack
-        }
+        return daily_protein * _PROTEIN_DISTRIBUTION.get(meal_type, 0.25)
 
-        return daily_protein * protein_distribution.get(meal_type, 0.25)
+    def calculate_main_meal_protein_target(
+        self, user_data: Union[Dict, UserContext]
+    ) -> float:
+        """Protein target used when ranking dishes without a specific meal type."""
+        if isinstance(user_data, UserContext):
+            daily_protein = user_data.daily_protein
+        else:
+            daily_protein = self.calculate_user_protein_needs(user_data)
+        return daily_protein * 0.3  # Assume this is for a main meal
 
     def normalize_user_preferences(
         self, user_data: Dict[str, Union[str, int, List]]
@@ -92,16 +228,7 @@ class DishFilter:
         normalized = {}
 
         # Map frontend field names to dish attribute names
-        field_mapping = {
-            "primary_goal": "health_suitability",
-            "lifestyle_type": "lifestyle_suitability",
-            "dietary_strictness": "dietary_suitability",
-            "flavor_preferences": "flavor_profile",
-            "prep_skill_level": "prep_complexity",
-            "affordability_preference": "ingredient_affordability",
-        }
-
-        for frontend_key, dish_key in field_mapping.items():
+        for frontend_key, dish_key in _PREFERENCE_FIELDS.items():
             if frontend_key in user_data and user_data[frontend_key]:
                 value = str(user_data[frontend_key]).lower().replace(" ", "_")
                 # Handle special cases
@@ -111,31 +238,66 @@ class DishFilter:
 
         return normalized
 
+    def build_user_context(self, user_data: Dict) -> UserContext:
+        """
+        Normalize the user fields used by scoring and constraint checks, along
+        with the user's daily protein need.
+        """
+        if isinstance(user_data, UserContext):
+            return user_data
+
+        return UserContext(
+            normalized_prefs=self.normalize_user_preferences(user_data),
+            allergies=frozenset(
+                allergy.strip().lower()
+                for allergy in user_data.get("known_allergies", [])
+                if isinstance(allergy, str) and allergy.strip()
+            ),
+            dietary=user_data.get("dietary_strictness", "").lower(),
+            personas=frozenset(user_data.get("persona_tags", [])),
+            meal_times=frozenset(
+                time
+                for time in map(str.lower, user_data.get("preferred_meal_times", []))
+                if time in self.meal_type_mapping
+            ),
+            region=user_data.get("Region", "").lower(),
+            daily_protein=self.calculate_user_protein_needs(user_data),
+        )
+
     def _normalize_health_goal(self, goal: str) -> str:
         """Normalize health goals to match dish health_suitability options."""
-        goal_mapping = {
-            "weight_loss": "weight loss",
-            "muscle_gain": "muscle gain",
-            "medical_therapy": "medical recovery",
-            "cardiac": "cardiac",
-            "diabetes": "diabetes",
-            "maintenance": "maintenance",
-            "recovery": "recovery",
-        }
-        return goal_mapping.get(goal, goal.replace("_", " "))
+        return _HEALTH_GOALS.get(goal, goal.replace("_", " "))
 
     def calculate_comprehensive_score(
         self,
         dish: Dict[str, Union[str, dict, list]],
-        user_data: Dict[str, Union[str, int, List]],
+        user_data: Union[Dict[str, Union[str, int, List]], UserContext],
         target_calories: Optional[int] = None,
         target_protein: Optional[float] = None,
     ) -> float:
         """
         Calculate comprehensive score for a dish based on multiple factors including protein.
+        Accepts a prebuilt UserContext to skip renormalizing the user per dish.
         """
+        return self._score_dish(
+            dish,
+            dish_tags(dish),
+            self.build_user_context(user_data),
+            target_calories,
+            target_protein,
+        )
+
+    def _score_dish(
+        self,
+        dish: Dict,
+        tags: DishTags,
+        ctx: UserContext,
+        target_calories: Optional[int],
+        target_protein: Optional[float],
+    ) -> float:
+        """calculate_comprehensive_score for a dish whose tags are already read."""
         total_score = 0.0
-        normalized_prefs = self.normalize_user_preferences(user_data)
+        normalized_prefs = ctx.normalized_prefs
 
         # 1. Attribute Rankings Score (primary scoring mechanism)
         rankings = dish.get("attribute_rankings", {})
@@ -160,19 +322,19 @@ class DishFilter:
             total_score += protein_score * self.score_weights["protein_alignment"]
 
         # 4. Dietary Compatibility
-        dietary_score = self._calculate_dietary_compatibility(dish, user_data)
+        dietary_score = self._calculate_dietary_compatibility(tags, ctx)
         total_score += dietary_score * self.score_weights["dietary_match"]
 
         # 5. Allergy Risk Assessment
-        allergy_penalty = self._calculate_allergy_risk(dish, user_data)
+        allergy_penalty = self._calculate_allergy_risk(tags, ctx)
         total_score += allergy_penalty * abs(self.score_weights["allergy_penalty"])
 
         # 6. Meal Timing Preference
-        timing_score = self._calculate_meal_timing_score(dish, user_data)
+        timing_score = self._calculate_meal_timing_score(tags, ctx)
         total_score += timing_score * self.score_weights["meal_timing"]
 
         # 7. Persona Tags Bonus
-        persona_score = self._calculate_persona_match(dish, user_data)
+        persona_score = self._calculate_persona_match(tags, ctx)
         total_score += persona_score * self.score_weights["persona_bonus"]
 
         return total_score
@@ -213,76 +375,48 @@ class DishFilter:
 
         return caloric_rankings.get(density, 0)
 
-    def _calculate_dietary_compatibility(self, dish: Dict, user_data: Dict) -> float:
+    def _calculate_dietary_compatibility(
+        self, tags: DishTags, ctx: UserContext
+    ) -> float:
         """Calculate dietary compatibility score."""
         score = 0
-        dish_diet_tags = [tag.lower() for tag in dish.get("diet_tags", [])]
-        user_dietary = user_data.get("dietary_strictness", "").lower()
+        dish_diet_tags = tags.diet_tags
 
         # Direct dietary match
-        if user_dietary in dish_diet_tags:
+        if ctx.dietary in dish_diet_tags:
             score += 3
 
         # Check for dietary conflicts
-        dietary_conflicts = {
-            "vegan": ["non-vegetarian", "dairy"],
-            "vegetarian": ["non-vegetarian"],
-            "diabetic-friendly": ["high-sugar", "sweet"],
-            "gluten-free": ["gluten"],
-        }
-
-        if user_dietary in dietary_conflicts:
-            conflicts = dietary_conflicts[user_dietary]
-            if any(conflict in dish_diet_tags for conflict in conflicts):
-                score -= 5
+        conflicts = _DIETARY_CONFLICTS.get(ctx.dietary)
+        if conflicts is not None and not conflicts.isdisjoint(dish_diet_tags):
+            score -= 5
 
         return score
 
-    def _calculate_allergy_risk(self, dish: Dict, user_data: Dict) -> float:
+    def _calculate_allergy_risk(self, tags: DishTags, ctx: UserContext) -> float:
         """Calculate allergy risk penalty."""
-        user_allergies = set()
-        if "known_allergies" in user_data:
-            user_allergies = {
-                allergy.strip().lower()
-                for allergy in user_data["known_allergies"]
-                if isinstance(allergy, str) and allergy.strip()
-            }
-
-        dish_allergens = set(
-            allergen.lower() for allergen in dish.get("allergy_risks", [])
-        )
-
         # Return penalty for each allergy conflict
-        conflicts = user_allergies.intersection(dish_allergens)
+        conflicts = ctx.allergies.intersection(tags.allergens)
         return -len(conflicts) if conflicts else 0
 
-    def _calculate_meal_timing_score(self, dish: Dict, user_data: Dict) -> float:
+    def _calculate_meal_timing_score(self, tags: DishTags, ctx: UserContext) -> float:
         """Calculate meal timing preference alignment."""
-        user_meal_times = user_data.get("preferred_meal_times", [])
-        dish_suitable_times = dish.get("time_of_day_suitability", [])
+        dish_suitable_times = tags.suitable_times
 
-        if not user_meal_times or not dish_suitable_times:
+        if not ctx.meal_times or not dish_suitable_times:
             return 0
 
-        # Convert user preferences to dish timing format
-        dish_times = []
-        for time in user_meal_times:
-            if time.lower() in self.meal_type_mapping:
-                dish_times.extend(
-                    [t for t in dish_suitable_times if time.lower() in t.lower()]
-                )
-
-        return len(set(dish_times)) * 0.5
+        # Few distinct time combinations exist, so the match count is memoized
+        return _count_matching_times(ctx.meal_times, dish_suitable_times) * 0.5
 
-    def _calculate_persona_match(self, dish: Dict, user_data: Dict) -> float:
+    def _calculate_persona_match(self, tags: DishTags, ctx: UserContext) -> float:
         """Calculate persona tags alignment bonus."""
-        user_personas = set(user_data.get("persona_tags", []))
-        dish_personas = set(dish.get("persona_tags", []))
+        dish_personas = tags.personas
 
-        if not user_personas or not dish_personas:
+        if not ctx.personas or not dish_personas:
             return 0
 
-        matches = user_personas.intersection(dish_personas)
+        matches = ctx.personas.intersection(dish_personas)
         return len(matches) * 0.5
 
     def filter_dishes_by_constraints(
@@ -291,109 +425,152 @@ class DishFilter:
         """
         Filter dishes based on hard constraints (allergies, dietary restrictions).
         """
-        filtered_dishes = []
+        ctx = self.build_user_context(user_data)
+        return [dish for dish in dishes if self.meets_constraints(dish, ctx)]
 
-        for dish in dishes:
-            # Check allergy constraints
-            if self._has_allergy_conflict(dish, user_data):
-                continue
+    def meets_constraints(
+        self, dish: Dict, ctx: UserContext, tags: Optional[DishTags] = None
+    ) -> bool:
+        """
+        Check a single dish against the user's hard constraints. Pass the
+        dish's tags when the caller has already read them.
+        """
+        tags = tags or dish_tags(dish)
 
-            # Check dietary restrictions
-            if self._has_dietary_conflict(dish, user_data):
-                continue
+        # Check allergy constraints
+        if self._has_allergy_conflict(tags, ctx):
+            return False
 
-            # Check region preference if specified
-            user_region = user_data.get("Region", "").lower()
-            if user_region and dish.get("region", "").lower() != user_region:
-                continue
+        # Check dietary restrictions
+        if self._has_dietary_conflict(tags, ctx):
+            return False
 
-            filtered_dishes.append(dish)
+        # Check region preference if specified
+        if ctx.region and dish.get("region", "").lower() != ctx.region:
+            return False
 
-        return filtered_dishes
+        return True
 
-    def _has_allergy_conflict(self, dish: Dict, user_data: Dict) -> bool:
+    def _has_allergy_conflict(self, tags: DishTags, ctx: UserContext) -> bool:
         """Check if dish conflicts with user allergies."""
-        user_allergies = set(
-            allergy.strip().lower()
-            for allergy in user_data.get("known_allergies", [])
-            if isinstance(allergy, str) and allergy.strip()
-        )
-
-        dish_allergens = set(
-            allergen.lower() for allergen in dish.get("allergy_risks", [])
-        )
-
-        return bool(user_allergies.intersection(dish_allergens))
+        return not ctx.allergies.isdisjoint(tags.allergens)
 
-    def _has_dietary_conflict(self, dish: Dict, user_data: Dict) -> bool:
+    def _has_dietary_conflict(self, tags: DishTags, ctx: UserContext) -> bool:
         """Check if dish conflicts with dietary preferences."""
-        user_dietary = user_data.get("dietary_strictness", "").lower()
-        dish_diet_tags = [tag.lower() for tag in dish.get("diet_tags", [])]
-
-        # Strict dietary conflicts
-        conflicts = {"vegan": "non-vegetarian", "vegetarian": "non-vegetarian"}
-
-        if user_dietary in conflicts:
-            return conflicts[user_dietary] in dish_diet_tags
-
-        return False
+        conflicts = _STRICT_DIETARY_CONFLICTS.get(ctx.dietary)
+        return conflicts is not None and not conflicts.isdisjoint(tags.diet_tags)
 
     def get_best_dishes_by_meal_type(
         self,
         dishes: List[Dict],
-        user_data: Dict,
+        user_data: Union[Dict, UserContext],
         meal_type: str,
         target_calories: Optional[int] = None,
         target_protein: Optional[float] = None,
         top_n: int = 5,
+        rows: Optional[np.ndarray] = None,
     ) -> List[Dict]:
         """
         Get the best dishes for a specific meal type with protein optimization.
+        Callers holding a prebuilt index of the meal type's dishes can pass it
+        as rows to skip the meal type lookup. Pools without a prebuilt
+        DishTable are scored dish by dish.
         """
+        table = self.dish_table(dishes)
+        if table is None:
+            return self._rank_dishes(
+                dishes,
+                user_data,
+                meal_type,
+                target_calories,
+                target_protein,
+                top_n,
+                rows,
+            )
+
         # Filter dishes by meal type
-        meal_dishes = [
-            dish
-            for dish in dishes
-            if dish.get("meal_type", "").lower() == meal_type.lower()
-        ]
+        if rows is None:
+            rows = table.rows_for_meal_type(meal_type)
 
-        if not meal_dishes:
+        if not len(rows):
             return []
 
         # Apply constraint filtering
-        filtered_dishes = self.filter_dishes_by_constraints(meal_dishes, user_data)
+        rows = rows[table.constraint_mask(user_data, rows)]
 
-        if not filtered_dishes:
+        if not len(rows):
             logger.warning(
                 f"No dishes available for {meal_type} after constraint filtering"
             )
             return []
 
-        # Score and rank dishes
-        scored_dishes = []
-        for dish in filtered_dishes:
-            score = self.calculate_comprehensive_score(
-                dish, user_data, target_calories, target_protein
-            )
-            scored_dishes.append((dish, score))
+        # Score and rank dishes, then return top N
+        scores = table.score(user_data, rows, target_calories, target_protein)
+        return [dishes[row] for row in table.top_rows(rows, scores, top_n)]
 
-        # Sort by score (descending)
-        scored_dishes.sort(key=lambda x: x[1], reverse=True)
+    def _rank_dishes(
+        self,
+        dishes: List[Dict],
+        user_data: Union[Dict, UserContext],
+        meal_type: str,
+        target_calories: Optional[int],
+        target_protein: Optional[float],
+        top_n: int,
+        rows: Optional[np.ndarray],
+    ) -> List[Dict]:
+        """Per-dish get_best_dishes_by_meal_type for pools without a DishTable."""
+        ctx = self.build_user_context(user_data)
+
+        # Filter dishes by meal type, then read each remaining dish's tags once
+        if rows is None:
+            meal_type_lc = meal_type.lower()
+            meal_dishes = [
+                dish
+                for dish in dishes
+                if dish.get("meal_type", "").lower() == meal_type_lc
+            ]
+        else:
+            meal_dishes = [dishes[row] for row in rows]
+        meal_dishes = [(dish, dish_tags(dish)) for dish in meal_dishes]
+
+        if not meal_dishes:
+            return []
+
+        # Apply constraint filtering
+        filtered_dishes = [
+            (dish, tags)
+            for dish, tags in meal_dishes
+            if self.meets_constraints(dish, ctx, tags)
+        ]
+
+        if not filtered_dishes:
+            logger.warning(
+                f"No dishes available for {meal_type} after constraint filtering"
+            )
+            return []
 
-        # Return top N dishes
-        return [dish for dish, score in scored_dishes[:top_n]]
+        # Score and rank dishes (stable, so ties keep pool order), then return top N
+        scores = [
+            self._score_dish(dish, tags, ctx, target_calories, target_protein)
+            for dish, tags in filtered_dishes
+        ]
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        return [filtered_dishes[index][0] for index in ranked[:top_n]]
 
     def get_optimal_dish(
         self,
         dishes: List[Dict],
-        user_data: Dict,
+        user_data: Union[Dict, UserContext],
         meal_type: str,
         target_calories: Optional[int] = None,
         target_protein: Optional[float] = None,
         randomize_top_n: int = 3,
+        rows: Optional[np.ndarray] = None,
+        rng: Optional[random.Random] = None,
     ) -> Optional[Dict]:
         """
         Get a single optimal dish with some randomization from top choices.
+        Pass a per-request rng for reproducible picks; defaults to the global one.
         """
         top_dishes = self.get_best_dishes_by_meal_type(
             dishes,
@@ -402,39 +579,39 @@ class DishFilter:
             target_calories,
             target_protein,
             randomize_top_n,
+            rows,
         )
 
         if not top_dishes:
             return None
 
         # Randomly select from top choices to add variety
-        return random.choice(top_dishes)
+        return (rng or random).choice(top_dishes)
 
     def generate_complete_meal_plan(
-        self, dishes: List[Dict], user_data: Dict, target_daily_calories: int
+        self,
+        dishes: List[Dict],
+        user_data: Dict,
+        target_daily_calories: int,
+        rng: Optional[random.Random] = None,
     ) -> Dict[str, Optional[Dict]]:
         """
         Generate a complete meal plan with optimal calorie and protein distribution.
         """
-        # Calculate daily protein needs
-        daily_protein = self.calculate_user_protein_needs(user_data)
-
-        # Typical calorie and protein distribution
-        calorie_distribution = {
-            "breakfast": 0.25,
-            "lunch": 0.35,
-            "dinner": 0.30,
-            "snack": 0.10,
+        # Calorie and protein targets for every meal type, computed up front
+        ctx = self.build_user_context(user_data)
+        daily_protein = ctx.daily_protein
+        plan_targets = {
+            meal_type: (
+                int(target_daily_calories * calorie_ratio),
+                self.calculate_meal_protein_target(daily_protein, meal_type),
+            )
+            for meal_type, calorie_ratio in _CALORIE_DISTRIBUTION.items()
         }
 
         meal_plan = {}
 
-        for meal_type, calorie_ratio in calorie_distribution.items():
-            target_calories = int(target_daily_calories * calorie_ratio)
-            target_protein = self.calculate_meal_protein_target(
-                daily_protein, meal_type
-            )
-
+        for meal_type, (target_calories, target_protein) in plan_targets.items():
             if meal_type == "snack":
                 # Handle snacks separately - might want 1 or 2
                 snack_calories = (
@@ -443,55 +620,355 @@ class DishFilter:
                 snack_protein = target_protein
 
                 snack_1 = self.get_optimal_dish(
-                    dishes, user_data, "snack", snack_calories, snack_protein
+                    dishes, ctx, "snack", snack_calories, snack_protein, rng=rng
                 )
                 meal_plan["snack_1"] = snack_1
 
                 if target_calories > 100:
                     snack_2 = self.get_optimal_dish(
-                        dishes, user_data, "snack", snack_calories, snack_protein
+                        dishes, ctx, "snack", snack_calories, snack_protein, rng=rng
                     )
                     meal_plan["snack_2"] = snack_2
             else:
                 optimal_dish = self.get_optimal_dish(
-                    dishes, user_data, meal_type, target_calories, target_protein
+                    dishes, ctx, meal_type, target_calories, target_protein, rng=rng
                 )
                 meal_plan[meal_type] = optimal_dish
 
         return meal_plan
 
 
+# Holds no DishTable, so one instance serves every caller
+_DEFAULT_FILTER = DishFilter()
+
+
+class DishTable:
+    """
+    Column-wise view of a dish pool, built once at load time, that scores and
+    filters every dish of a meal type in a single vectorized pass. Scores match
+    DishFilter.calculate_comprehensive_score exactly.
+    """
+
+    def __init__(self, dishes: List[Dict], dish_filter: Optional[DishFilter] = None):
+        self.dishes = dishes
+        self.dish_filter = dish_filter or _DEFAULT_FILTER
+
+        # Tag sets are read once here, without writing them back to the dishes
+        tags = [dish_tags(dish) for dish in dishes]
+
+        self.protein = np.array(
+            [dish.get("protein_grams", 0) for dish in dishes], dtype=np.float64
+        )
+        self.regions = np.array(
+            [dish.get("region", "").lower() for dish in dishes], dtype=object
+        )
+
+        # Caloric density ranking each dish earns from its own calories
+        self.caloric_rank = np.zeros(len(dishes), dtype=np.float64)
+
+        # Row indices per meal type and one column per attribute ranking value
+        self.meal_type_rows = {}
+        self.attribute_columns = {}
+
+        for row, dish in enumerate(dishes):
+            self.meal_type_rows.setdefault(tags[row].meal_type, []).append(row)
+
+            rankings = dish.get("attribute_rankings", {})
+            for pref_key, values in rankings.items():
+                for pref_value, rank in values.items():
+                    column = self.attribute_columns.setdefault(
+                        (pref_key, pref_value), np.zeros(len(dishes), dtype=np.float64)
+                    )
+                    column[row] = rank
+
+            if "caloric_density" in rankings:
+                self.caloric_rank[row] = self.dish_filter._calculate_caloric_score(
+                    dish, 0, rankings["caloric_density"]
+                )
+
+        self.meal_type_rows = {
+            meal_type: np.array(rows, dtype=np.intp)
+            for meal_type, rows in self.meal_type_rows.items()
+        }
+
+        # One-hot tag matrices (dish rows x distinct tags)
+        self.diet_tags = self._build_tag_matrix([t.diet_tags for t in tags])
+        self.allergens = self._build_tag_matrix([t.allergens for t in tags])
+        self.persona_tags = self._build_tag_matrix([t.personas for t in tags])
+        self.suitable_times = self._build_tag_matrix([t.suitable_times for t in tags])
+        self.suitable_time_names = [
+            (dish_time, dish_time.lower()) for dish_time in self.suitable_times[1]
+        ]
+
+        # Diet and allergen tags packed into one uint64 bitmask per dish, so a
+        # conflict test is a single AND (None when a field has over 64 tags)
+        self.diet_bits = self._pack_tag_bits(self.diet_tags)
+        self.allergen_bits = self._pack_tag_bits(self.allergens)
+
+        # Score weights in the order the scoring kernel expects
+        self.weights = np.array(
+            [
+                self.dish_filter.score_weights[component]
+                for component in scoring_kernel.SCORE_COMPONENTS
+            ],
+            dtype=np.float64,
+        )
+        scoring_kernel.warm_up()
+
+    @staticmethod
+    def _build_tag_matrix(
+        tag_sets: List[frozenset],
+    ) -> Tuple[np.ndarray, Dict[str, int]]:
+        """Encode per-dish tag sets as a boolean matrix plus a tag -> column map."""
+        columns = {}
+        for tags in tag_sets:
+            for tag in sorted(tags):
+                columns.setdefault(tag, len(columns))
+
+        matrix = np.zeros((len(tag_sets), len(columns)), dtype=bool)
+        for row, tags in enumerate(tag_sets):
+            for tag in tags:
+                matrix[row, columns[tag]] = True
+
+        return matrix, columns
+
+    @staticmethod
+    def _pack_tag_bits(
+        tag_matrix: Tuple[np.ndarray, Dict[str, int]],
+    ) -> Optional[np.ndarray]:
+        """Pack a tag matrix into one uint64 bitmask per dish, bit i = column i."""
+        matrix, columns = tag_matrix
+        if len(columns) > 64:
+            return None
+        column_bits = np.left_shift(
+            np.uint64(1), np.arange(len(columns), dtype=np.uint64)
+        )
+        # Each row sums distinct powers of two, which equals OR-ing them
+        return (matrix * column_bits).sum(axis=1, dtype=np.uint64)
+
+    def _has_any_tag(
+        self,
+        tag_matrix: Tuple[np.ndarray, Dict[str, int]],
+        tag_bits: Optional[np.ndarray],
+        tags,
+        rows: np.ndarray,
+    ) -> np.ndarray:
+        """Check which selected dishes carry at least one of the given tags."""
+        if tag_bits is None:
+            return self._count_tags(tag_matrix, tags, rows) > 0
+
+        columns = tag_matrix[1]
+        user_bits = 0
+        for tag in tags:
+            if tag in columns:
+                user_bits |= 1 << columns[tag]
+        return (tag_bits[rows] & np.uint64(user_bits)) != 0
+
+    @staticmethod
+    def _count_tags(
+        tag_matrix: Tuple[np.ndarray, Dict[str, int]], tags, rows: np.ndarray
+    ) -> np.ndarray:
+        """Count how many of the given tags each selected dish carries."""
+        matrix, columns = tag_matrix
+        selected = [columns[tag] for tag in set(tags) if tag in columns]
+        if not selected:
+            return np.zeros(len(rows), dtype=np.float64)
+        return matrix[np.ix_(rows, selected)].sum(axis=1, dtype=np.float64)
+
+    def rows_for_meal_type(self, meal_type: str) -> np.ndarray:
+        """Get row indices of all dishes of a meal type."""
+        return self.meal_type_rows.get(meal_type.lower(), np.zeros(0, dtype=np.intp))
+
+    def constraint_mask(
+        self, user_data: Union[Dict, UserContext], rows: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized DishFilter.filter_dishes_by_constraints over the given rows."""
+        ctx = self.dish_filter.build_user_context(user_data)
+        mask = ~self._has_any_tag(
+            self.allergens, self.allergen_bits, ctx.allergies, rows
+        )
+
+        strict_conflicts = _STRICT_DIETARY_CONFLICTS.get(ctx.dietary)
+        if strict_conflicts:
+            mask &= ~self._has_any_tag(
+                self.diet_tags, self.diet_bits, strict_conflicts, rows
+            )
+
+        if ctx.region:
+            mask &= self.regions[rows] == ctx.region
+
+        return mask
+
+    def score(
+        self,
+        user_data: Union[Dict, UserContext],
+        rows: np.ndarray,
+        target_calories: Optional[int] = None,
+        target_protein: Optional[float] = None,
+    ) -> np.ndarray:
+        """Vectorized DishFilter.calculate_comprehensive_score over the given rows."""
+        ctx = self.dish_filter.build_user_context(user_data)
+
+        # Attribute rankings matching the user's preferences
+        attribute_score = np.zeros(len(rows), dtype=np.float64)
+        for pref_key, pref_value in ctx.normalized_prefs.items():
+            column = self.attribute_columns.get((pref_key, pref_value))
+            if column is not None:
+                attribute_score += column[rows]
+
+        # Caloric density only counts when a calorie target is given
+        if target_calories:
+            caloric_score = self.caloric_rank[rows]
+        else:
+            caloric_score = np.zeros(len(rows), dtype=np.float64)
+
+        # Tag counts for dietary, allergy, timing and persona components
+        diet_matches = self._has_any_tag(
+            self.diet_tags, self.diet_bits, [ctx.dietary], rows
+        ).astype(np.float64)
+        diet_conflicts = self._has_any_tag(
+            self.diet_tags,
+            self.diet_bits,
+            _DIETARY_CONFLICTS.get(ctx.dietary, ()),
+            rows,
+        ).astype(np.float64)
+        matched_times = [
+            dish_time
+            for dish_time, dish_time_lc in self.suitable_time_names
+            if any(time in dish_time_lc for time in ctx.meal_times)
+        ]
+
+        return scoring_kernel.score_all(
+            attribute_score,
+            caloric_score,
+            self.protein[rows],
+            diet_matches,
+            diet_conflicts,
+            self._count_tags(self.allergens, ctx.allergies, rows),
+            self._count_tags(self.suitable_times, matched_times, rows),
+            self._count_tags(self.persona_tags, ctx.personas, rows),
+            float(target_protein or 0),
+            self.weights,
+        )
+
+    def find_best_dish(
+        self,
+        user: Union[Dict, UserContext],
+        rows: np.ndarray,
+        top_n: int = 5,
+        target_protein: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[Dict]:
+        """
+        Vectorized find_best_dish restricted to the given rows. Pass
+        target_protein when ranking several meals for the same user.
+        """
+        ctx = self.dish_filter.build_user_context(user)
+        rows = rows[self.constraint_mask(ctx, rows)]
+
+        if not len(rows):
+            return None
+
+        if target_protein is None:
+            target_protein = self.dish_filter.calculate_main_meal_protein_target(ctx)
+        scores = self.score(ctx, rows, target_protein=target_protein)
+        return self._choose_top_dish(rows, scores, top_n, rng)
+
+    def find_best_dishes(
+        self,
+        user: Union[Dict, UserContext],
+        meal_types: List[str],
+        top_n: int = 5,
+        rng: Optional[random.Random] = None,
+        target_protein: Optional[float] = None,
+    ) -> List[Optional[Dict]]:
+        """
+        find_best_dish for several meal types at once. Scores and constraints
+        depend only on the user, so the whole pool is scored in a single pass
+        and each meal type picks from its own slice.
+        """
+        ctx = self.dish_filter.build_user_context(user)
+        all_rows = np.arange(len(self.dishes), dtype=np.intp)
+        allowed = self.constraint_mask(ctx, all_rows)
+        if target_protein is None:
+            target_protein = self.dish_filter.calculate_main_meal_protein_target(ctx)
+        scores = self.score(ctx, all_rows, target_protein=target_protein)
+
+        best_dishes = []
+        for meal_type in meal_types:
+            rows = self.rows_for_meal_type(meal_type)
+            rows = rows[allowed[rows]]
+            if not len(rows):
+                best_dishes.append(None)
+                continue
+            best_dishes.append(self._choose_top_dish(rows, scores[rows], top_n, rng))
+
+        return best_dishes
+
+    @staticmethod
+    def top_rows(rows: np.ndarray, scores: np.ndarray, top_n: int) -> np.ndarray:
+        """
+        Get the top_n rows by descending score, ties kept in row order. Only
+        dishes scoring at least the top_n-th best score get sorted.
+        """
+        if top_n <= 0 or not len(rows):
+            return rows[:0]
+        if top_n == 1:
+            # argmax returns the first of tied maxima, like a stable sort
+            return rows[[np.argmax(scores)]]
+        if top_n < len(rows):
+            cutoff = -np.partition(-scores, top_n - 1)[top_n - 1]
+            candidates = np.flatnonzero(scores >= cutoff)
+            rows, scores = rows[candidates], scores[candidates]
+        return rows[np.argsort(-scores, kind="stable")[:top_n]]
+
+    def _choose_top_dish(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        top_n: int,
+        rng: Optional[random.Random] = None,
+    ) -> Dict:
+        """Randomly pick one of the top_n rows, ranked by score with stable ties."""
+        top_rows = self.top_rows(rows, scores, top_n)
+        return (rng or random).choice([self.dishes[row] for row in top_rows])
+
+
 # Usage function for backward compatibility
 def find_best_dish(
     dishes: List[Dict[str, Union[str, list, dict]]],
-    user: Dict[str, Union[str, int]],
+    user: Union[Dict[str, Union[str, int]], UserContext],
     top_n: int = 5,
+    target_protein: Optional[float] = None,
+    rng: Optional[random.Random] = None,
 ) -> Union[Dict[str, Union[str, list, dict]], None]:
     """
-    Backward compatibility function for existing codebase.
+    Backward compatibility function for existing codebase. Callers ranking
+    several meals for one user can pass the protein target computed once.
     """
-    filter_system = DishFilter()
-
-    # Get dishes of any meal type
-    filtered_dishes = filter_system.filter_dishes_by_constraints(dishes, user)
-
-    if not filtered_dishes:
-        return None
+    filter_system = _DEFAULT_FILTER
+    ctx = filter_system.build_user_context(user)
 
     # Calculate protein target for better scoring
-    daily_protein = filter_system.calculate_user_protein_needs(user)
-    target_protein = daily_protein * 0.3  # Assume this is for a main meal
-
-    # Score all dishes
-    scored_dishes = []
-    for dish in filtered_dishes:
-        score = filter_system.calculate_comprehensive_score(
-            dish, user, target_protein=target_protein
-        )
-        scored_dishes.append((dish, score))
+    if target_protein is None:
+        target_protein = filter_system.calculate_main_meal_protein_target(ctx)
+
+    # Filter and score dishes of any meal type in a single pass, keeping
+    # dishes and scores in parallel lists
+    candidates = []
+    scores = []
+    for dish in dishes:
+        tags = dish_tags(dish)
+        if filter_system.meets_constraints(dish, ctx, tags):
+            candidates.append(dish)
+            scores.append(
+                filter_system._score_dish(dish, tags, ctx, None, target_protein)
+            )
 
-    # Sort and get top dishes
-    scored_dishes.sort(key=lambda x: x[1], reverse=True)
-    top_dishes = [dish for dish, score in scored_dishes[:top_n]]
+    # Keep only the top dishes (ties stay in pool order, as with a stable sort)
+    top_rows = DishTable.top_rows(
+        np.arange(len(candidates)), np.array(scores, dtype=np.float64), top_n
+    )
+    top_dishes = [candidates[row] for row in top_rows]
 
-    return random.choice(top_dishes) if top_dishes else None
+    return (rng or random).choice(top_dishes) if top_dishes else None
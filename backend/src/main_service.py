@@ -1,40 +1,47 @@
-import json
-import pandas as pd
-from transformers import pipeline
+import hashlib
+import orjson
+import random
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from calorie_splitter import split_calories
-from dish_filter import find_best_dish
-from new_prompt_builder import build_prompt
+from config import MENU_PATH
+from dish_filter import DishTable
+from new_prompt_builder import build_prompt, build_user_profile
+from text_generator import DescriptionCache, load_generator, warm_up_generator
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PLAN_CACHE_SIZE = 1024  # Complete meal plans kept in memory
+
+
+@lru_cache(maxsize=1)
+def get_generator():
+    """Load the text generation pipeline on first use and share it afterwards."""
+    return load_generator()
+
 
 class MealPlannerService:
     def __init__(self):
         """Initialize the meal planner service with required resources."""
         # Load dish libraries
         try:
-            with open(
-                r"D:\projects\Mealplanner\backend\dish_library\menu.json",
-                "r",
-                encoding="utf-8",
-            ) as f:
-                self.dish_pool = json.load(f)
+            with open(MENU_PATH, "rb") as f:
+                self.dish_pool = orjson.loads(f.read())
             logger.info(f"Loaded {len(self.dish_pool)} dishes from library")
         except Exception as e:
             logger.error(f"Failed to load dishes: {e}")
             self.dish_pool = []
 
+        # Column-wise view of the pool used to score dishes in bulk
+        self.dish_table = DishTable(self.dish_pool)
+
         # Set up text generation model
         try:
-            self.generator = pipeline(
-                "text2text-generation",
-                model="MBZUAI/LaMini-Flan-T5-783M",
-                max_new_tokens=150,
-                truncation=True,
-            )
+            self.generator = get_generator()
             self.model_loaded = True
             logger.info("AI model successfully initialized")
         except Exception as e:
@@ -42,31 +49,108 @@ class MealPlannerService:
             self.generator = None
             self.model_loaded = False
 
+        if self.model_loaded:
+            try:
+                warm_up_generator(self.generator, self.dish_pool)
+            except Exception as e:
+                logger.warning(f"AI model warm-up failed: {e}")
+
+        # Generated descriptions, with their own hit/miss counts
+        self.descriptions = DescriptionCache()
+        self.cache_stats = Counter()
+
+        # LRU of complete (meal_plan, meal_calories) results per user profile
+        self._plan_cache = OrderedDict()
+        self._plan_lock = threading.Lock()
+
     def generate_meal_plan(self, user_data, caloric_intake):
-        """Generate meal plan for a user based on input data and caloric intake."""
+        """
+        Generate meal plan for a user based on input data and caloric intake.
+        The same profile and calories always get the same plan, served from
+        the plan cache after the first request.
+        """
         if isinstance(user_data, list):
             logger.warning("user_data is a list — using first item.")
             user_data = user_data[0]
 
+        try:
+            cache_key = (freeze_user_data(user_data), caloric_intake)
+            hash(cache_key)
+        except TypeError:
+            cache_key = None  # Profile holds values that cannot be cached
+
+        cached_plan = self.get_cached_plan(cache_key)
+        if cached_plan is not None:
+            meal_plan, meal_calories = cached_plan
+            return dict(meal_plan), dict(meal_calories)
+
+        # Seed dish choices from the profile so the plan is reproducible
+        rng = None
+        if cache_key is not None:
+            seed = hashlib.blake2b(repr(cache_key).encode(), digest_size=8).digest()
+            rng = random.Random(seed)
+
+        meal_plan, meal_calories, ok = self.plan_meals(user_data, caloric_intake, rng)
+
+        # Failed or empty generations are transient, so only cache clean plans
+        if ok:
+            self.cache_plan(cache_key, meal_plan, meal_calories)
+
+        return meal_plan, meal_calories
+
+    def get_cached_plan(self, cache_key):
+        """Return the cached (meal_plan, meal_calories) for a key, or None."""
+        if cache_key is None:
+            return None
+        with self._plan_lock:
+            cached_plan = self._plan_cache.get(cache_key)
+            if cached_plan is not None:
+                self._plan_cache.move_to_end(cache_key)
+                self.cache_stats["plan_hits"] += 1
+            return cached_plan
+
+    def cache_plan(self, cache_key, meal_plan, meal_calories):
+        """Remember a plan, evicting the least recently used one when full."""
+        if cache_key is None:
+            return
+        with self._plan_lock:
+            self._plan_cache[cache_key] = (dict(meal_plan), dict(meal_calories))
+            self._plan_cache.move_to_end(cache_key)
+            if len(self._plan_cache) > PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+
+    def plan_meals(self, user_data, caloric_intake, rng=None):
+        """
+        Pick a dish and write a description for every meal of the day.
+        Returns (meal_plan, meal_calories, ok), where ok is False when any
+        description failed to generate.
+        """
         meal_freq = user_data.get("Meal_Frequency", "3 meals + 2 snacks")
         meal_calories = split_calories(caloric_intake, meal_freq)
 
         logger.info(f"Calorie Distribution Across Meals: {meal_calories}")
 
         meal_plan = {}
+        prompts = {}  # meal_name -> prompt, generated together after the loop
+        user_profile = build_user_profile(user_data)  # Shared by every meal prompt
+
+        # Normalized profile and protein target shared by every meal's ranking
+        dish_filter = self.dish_table.dish_filter
+        user_context = dish_filter.build_user_context(user_data)
+        target_protein = dish_filter.calculate_main_meal_protein_target(user_context)
 
         for meal_name, kcal in meal_calories.items():
             dish_type = "snack" if meal_name.startswith("snack") else meal_name
 
-            filtered_dishes = [
-                dish for dish in self.dish_pool if dish.get("meal_type") == dish_type
-            ]
+            rows = self.dish_table.rows_for_meal_type(dish_type)
 
-            if not filtered_dishes:
+            if not len(rows):
                 meal_plan[meal_name] = f"No {dish_type} dishes available."
                 continue
 
-            best_dish = find_best_dish(filtered_dishes, user_data)
+            best_dish = self.dish_table.find_best_dish(
+                user_context, rows, target_protein=target_protein, rng=rng
+            )
 
             if not best_dish:
                 meal_plan[meal_name] = f"No suitable {meal_name.title()} found."
@@ -75,32 +159,84 @@ class MealPlannerService:
             best_dish = best_dish[0] if isinstance(best_dish, list) else best_dish
 
             # Build and log prompt
-            prompt = build_prompt(user_data, meal_name, kcal, best_dish)
+            prompt = build_prompt(user_data, meal_name, kcal, best_dish, user_profile)
             logger.info(f"Prompt for {meal_name.title()}:\n{prompt}")
 
             if not self.model_loaded:
                 result = f"AI model unavailable. Recommended: {best_dish.get('cultural_significance', best_dish.get('name', meal_name))}"
+                meal_plan[meal_name] = result
             else:
-                try:
-                    model_output = self.generator(prompt)
-                    logger.info(f"Model Output for {meal_name}: {model_output}")
+                meal_plan[meal_name] = None  # Keep meal order; filled in below
+                prompts[meal_name] = prompt
 
-                    if not model_output or "generated_text" not in model_output[0]:
-                        result = "⚠️ Model returned no valid output."
-                    else:
-                        result = model_output[0]["generated_text"].strip()
+        ok = True
+        if prompts:
+            descriptions, ok = self.generate_descriptions(prompts)
+            meal_plan.update(descriptions)
 
-                except Exception as e:
-                    logger.error(f"Generation failed for {meal_name}: {str(e)}")
-                    result = f"❌ Generation failed: {str(e)}"
+        return meal_plan, meal_calories, ok
 
-            meal_plan[meal_name] = result
+    def generate_descriptions(self, prompts):
+        """
+        Describe every meal, reusing cached outputs for prompts seen before and
+        running the rest through the model in a single batched call.
+        Returns (descriptions, ok), where ok is False when any meal got a
+        failure message instead of a description.
+        """
+        results, pending = self.descriptions.lookup(prompts)
 
-        return meal_plan, meal_calories
+        if not pending:
+            return results, True
+
+        try:
+            generated = self.descriptions.generate(self.generator, pending)
+        except Exception as e:
+            logger.error(f"Generation failed for {', '.join(pending)}: {str(e)}")
+            self.cache_stats["generation_failures"] += 1
+            for meal_name in pending:
+                results[meal_name] = f"❌ Generation failed: {str(e)}"
+            return results, False
+
+        ok = True
+        for meal_name in pending:
+            # Empty outputs count as failures so the plan holding them is not
+            # cached either
+            if meal_name not in generated:
+                results[meal_name] = "⚠️ Model returned no valid output."
+                self.cache_stats["generation_failures"] += 1
+                ok = False
+                continue
+
+            results[meal_name] = generated[meal_name]
+
+        return results, ok
+
+
+def freeze_user_data(value):
+    """
+    Turn a user profile into a hashable value, converting lists, dicts and
+    sets. Sets become sorted tuples so the value's repr, which seeds plan
+    dish choices, is the same in every process.
+    """
+    if isinstance(value, dict):
+        return tuple(
+            sorted((key, freeze_user_data(item)) for key, item in value.items())
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_user_data(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze_user_data(item) for item in value))
+    return value
+
+
+@lru_cache(maxsize=1)
+def get_meal_planner_service():
+    """Shared MealPlannerService, so the dish pool and model load only once."""
+    return MealPlannerService()
 
 
 # Standalone usage function
 def generate_standalone_meal_plan(user_data, caloric_intake):
     """Standalone function for generating meal plans outside of API context."""
-    service = MealPlannerService()
+    service = get_meal_planner_service()
     return service.generate_meal_plan(user_data, caloric_intake)
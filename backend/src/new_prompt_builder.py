@@ -1,50 +1,32 @@
 # Enhanced Prompt Builder Including Protein Analysis
 # File: new_prompt_builder.py
 
+from functools import lru_cache
+from typing import Optional, Tuple
 
-def build_prompt(user: dict, meal_name: str, calorie_limit: int, dish: dict) -> str:
-    """Build a prompt including protein context so model replies include protein analysis."""
-    goal = user.get("primary_goal", "general wellness").replace("_", " ").title()
-    dietary = user.get("dietary_strictness", "Vegetarian").replace("-", " ").title()
-    lifestyle = user.get("lifestyle_type", "Moderate").capitalize()
-    region = user.get("Region", "North").title()
-    flavor = user.get("flavor_preferences", "Mild").capitalize()
-    meal_label = meal_name.replace("_", " ").title()
-
-    dish_protein = dish.get("protein_grams", 0)
-    tags = ", ".join(dish.get("diet_tags", []))
-    health_benefits = ", ".join(dish.get("health_benefits", []))
-    protein_source = dish.get("protein_source_type", "mixed")
-
-    # Estimate user daily protein need roughly (1.5g/kg default) for context
-    weight = user.get("weight_kg", 70)
-    daily_protein_need = int(weight * 1.5)
-    meal_protein_target = (
-        int(daily_protein_need * 0.3)
-        if meal_label.lower() != "snack"
-        else int(daily_protein_need * 0.1)
-    )
+# User block of the prompt; identical for every meal of a plan
+_USER_PROFILE_TEMPLATE = """- Region: {region}
+- Goal: {goal}
+- Dietary Pref.: {dietary}
+- Lifestyle: {lifestyle}
+- Weight: {weight} kg (≈ Daily protein need {daily_protein_need} g)
+""".format
 
-    prompt = f"""
+_PROMPT_TEMPLATE = """
 You are a certified sports nutritionist focused on Indian cuisine.
 Explain why the following {meal_label} dish is a great choice for the user below.
 Make sure to reference: calories, *exact* protein grams, health goal, dietary preference, lifestyle, and cultural relevance.
 
 User:
-- Region: {region}
-- Goal: {goal}
-- Dietary Pref.: {dietary}
-- Lifestyle: {lifestyle}
-- Weight: {weight} kg (≈ Daily protein need {daily_protein_need} g)
-- Target for this meal: {calorie_limit} kcal & {meal_protein_target} g protein
+{user_profile}- Target for this meal: {calorie_limit} kcal & {meal_protein_target} g protein
 
 Dish:
-- Name: {dish["name"]}
-- Calories: {dish["calories"]} kcal
+- Name: {name}
+- Calories: {calories} kcal
 - Protein: {dish_protein} g ({protein_source})
-- Diet Tags: {tags or "—"}
-- Health Benefits: {health_benefits or "—"}
-- Cultural Note: {dish.get("cultural_significance", "Traditional dish")}.
+- Diet Tags: {tags}
+- Health Benefits: {health_benefits}
+- Cultural Note: {cultural_note}.
 
 Reply **exactly in this structured markdown**:
 **Recommended Dish**: <name>
@@ -52,5 +34,67 @@ Reply **exactly in this structured markdown**:
 **Nutritional Highlights**: <calories & protein>
 **Protein Analysis**: <link protein grams to user target>
 **Cultural Context**: <1 sentence>
-"""
-    return prompt
+""".format
+
+
+def build_user_profile(user: dict) -> Tuple[str, int]:
+    """
+    Format the user block of the prompt and the daily protein need behind it.
+    Build it once per request and pass it to build_prompt for every meal.
+    """
+    return _format_user_profile(
+        user.get("Region", "North"),
+        user.get("primary_goal", "general wellness"),
+        user.get("dietary_strictness", "Vegetarian"),
+        user.get("lifestyle_type", "Moderate"),
+        user.get("weight_kg", 70),
+    )
+
+
+@lru_cache(maxsize=1024, typed=True)
+def _format_user_profile(
+    region: str, goal: str, dietary: str, lifestyle: str, weight
+) -> Tuple[str, int]:
+    # Estimate user daily protein need roughly (1.5g/kg default) for context
+    daily_protein_need = int(weight * 1.5)
+    user_profile = _USER_PROFILE_TEMPLATE(
+        region=region.title(),
+        goal=goal.replace("_", " ").title(),
+        dietary=dietary.replace("-", " ").title(),
+        lifestyle=lifestyle.capitalize(),
+        weight=weight,
+        daily_protein_need=daily_protein_need,
+    )
+    return user_profile, daily_protein_need
+
+
+def build_prompt(
+    user: dict,
+    meal_name: str,
+    calorie_limit: int,
+    dish: dict,
+    user_profile: Optional[Tuple[str, int]] = None,
+) -> str:
+    """Build a prompt including protein context so model replies include protein analysis."""
+    user_profile, daily_protein_need = user_profile or build_user_profile(user)
+    meal_label = meal_name.replace("_", " ").title()
+
+    meal_protein_target = (
+        int(daily_protein_need * 0.3)
+        if meal_label.lower() != "snack"
+        else int(daily_protein_need * 0.1)
+    )
+
+    return _PROMPT_TEMPLATE(
+        meal_label=meal_label,
+        user_profile=user_profile,
+        calorie_limit=calorie_limit,
+        meal_protein_target=meal_protein_target,
+        name=dish["name"],
+        calories=dish["calories"],
+        dish_protein=dish.get("protein_grams", 0),
+        protein_source=dish.get("protein_source_type", "mixed"),
+        tags=", ".join(dish.get("diet_tags", [])) or "—",
+        health_benefits=", ".join(dish.get("health_benefits", [])) or "—",
+        cultural_note=dish.get("cultural_significance", "Traditional dish"),
+    )
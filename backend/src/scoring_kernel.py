@@ -0,0 +1,77 @@
+# Numeric core of dish scoring
+# File: scoring_kernel.py
+
+import importlib.util
+
+import numpy as np
+
+# Order of the weights array passed to score_all
+SCORE_COMPONENTS = (
+    "attribute_rankings",
+    "caloric_alignment",
+    "protein_alignment",
+    "dietary_match",
+    "allergy_penalty",
+    "meal_timing",
+    "persona_bonus",
+)
+
+
+def score_all(
+    attribute,
+    caloric,
+    protein,
+    diet_matches,
+    diet_conflicts,
+    allergen_hits,
+    timing_hits,
+    persona_hits,
+    target_protein,
+    weights,
+):
+    """
+    Combine per-dish score components into final dish scores.
+
+    Component arrays hold one value per dish: summed attribute rankings, the
+    caloric density rank (zero when unused), protein grams, and counts of
+    matching diet tags, conflicting diet tags, allergens, meal times and
+    persona tags. Components are added in the same order as
+    DishFilter.calculate_comprehensive_score so results match it exactly.
+    """
+    total_score = attribute * weights[0]
+    total_score = total_score + caloric * weights[1]
+
+    if target_protein:
+        protein_ratio = protein / target_protein
+        protein_score = np.where(
+            (protein_ratio >= 0.8) & (protein_ratio <= 1.2),
+            3.0,
+            np.where(
+                (protein_ratio >= 0.6) & (protein_ratio <= 1.4),
+                2.0,
+                np.where((protein_ratio >= 0.4) & (protein_ratio <= 1.6), 1.0, -1.0),
+            ),
+        )
+        total_score = total_score + protein_score * weights[2]
+
+    dietary_score = 3.0 * diet_matches - 5.0 * (diet_conflicts > 0)
+    total_score = total_score + dietary_score * weights[3]
+    total_score = total_score + -allergen_hits * abs(weights[4])
+    total_score = total_score + (timing_hits * 0.5) * weights[5]
+    total_score = total_score + (persona_hits * 0.5) * weights[6]
+
+    return total_score
+
+
+# Compile the kernel to machine code when numba is available
+if importlib.util.find_spec("numba"):
+    from numba import njit
+
+    score_all = njit(cache=True)(score_all)
+
+
+def warm_up():
+    """Run the kernel once on a dummy dish so JIT compilation happens up front."""
+    one = np.ones(1, dtype=np.float64)
+    weights = np.ones(len(SCORE_COMPONENTS), dtype=np.float64)
+    score_all(one, one, one, one, one, one, one, one, 1.0, weights)
@@ -1,11 +1,39 @@
-# test_prompt_import.py
-import sys
-import os
+import pytest
 
-sys.path.insert(0, r"D:\meal_planner\datalumina-project-template\src")
+from calorie_splitter import split_calories
 
-try:
-    from prompt_builder import build_prompt
-    print("build_prompt imported successfully")
-except ImportError as e:
-    print(f"ImportError: {e}")
+
+def test_three_meals():
+    assert split_calories(2000, "3 meals") == {
+        "breakfast": 550,
+        "lunch": 650,
+        "dinner": 550,
+    }
+
+
+def test_three_meals_two_snacks():
+    assert split_calories(2000, "3 meals + 2 snacks") == {
+        "breakfast": 550,
+        "lunch": 650,
+        "dinner": 550,
+        "snack_1": 120,
+        "snack_2": 120,
+    }
+
+
+@pytest.mark.parametrize("total_calories", [1234, 1999, 2500.5, 3333])
+@pytest.mark.parametrize("meal_frequency", ["3 meals", "3 meals + 2 snacks"])
+def test_rounds_to_nearest_ten(total_calories, meal_frequency):
+    meals = split_calories(total_calories, meal_frequency)
+    assert all(calories % 10 == 0 for calories in meals.values())
+
+
+@pytest.mark.parametrize("total_calories", [0, -500, "2000", None])
+def test_rejects_non_positive_calories(total_calories):
+    with pytest.raises(ValueError):
+        split_calories(total_calories, "3 meals")
+
+
+def test_rejects_unknown_meal_frequency():
+    with pytest.raises(ValueError):
+        split_calories(2000, "5 meals")
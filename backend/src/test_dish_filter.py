@@ -0,0 +1,166 @@
+import itertools
+import random
+
+import numpy as np
+import orjson
+import pytest
+
+from config import MENU_PATH
+from dish_filter import DishFilter, DishTable, find_best_dish
+
+
+def load_menu():
+    with open(MENU_PATH, "rb") as f:
+        return orjson.loads(f.read())
+
+
+DISHES = load_menu()
+
+USERS = [
+    {
+        "weight_kg": weight,
+        "primary_goal": goal,
+        "dietary_strictness": dietary,
+        "lifestyle_type": lifestyle,
+        "known_allergies": allergies,
+        "preferred_meal_times": meal_times,
+        "persona_tags": personas,
+        "Region": "north",
+        "flavor_preferences": "spicy",
+        "prep_skill_level": "beginner",
+        "affordability_preference": "moderate",
+    }
+    for (goal, dietary, lifestyle, allergies, meal_times, personas), weight in zip(
+        itertools.product(
+            ["Weight Loss", "Muscle Gain", "Medical Therapy"],
+            ["vegan", "vegetarian", "non-vegetarian", "gluten-free"],
+            ["active", "elderly"],
+            [[], ["nuts", "Dairy "]],
+            [[], ["morning", "evening", "snacks"]],
+            [[], ["general", "weight-loss-friendly"]],
+        ),
+        itertools.cycle([50, 70, 95.5]),
+    )
+]
+
+TARGETS = [(None, None), (500, 25.0), (None, 18.0)]
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+
+
+@pytest.fixture(scope="module")
+def dish_filter():
+    dish_filter = DishFilter()
+    dish_filter.build_dish_table(DISHES)
+    return dish_filter
+
+
+def reference_best_dishes(dish_filter, user, meal_type, target_calories, top_n):
+    """Rank dishes the pre-vectorized way: filter, score each, stable sort."""
+    target_protein = 20.0
+    meal_dishes = [
+        dish for dish in DISHES if dish.get("meal_type", "").lower() == meal_type
+    ]
+    scored = [
+        (
+            dish,
+            dish_filter.calculate_comprehensive_score(
+                dish, user, target_calories, target_protein
+            ),
+        )
+        for dish in dish_filter.filter_dishes_by_constraints(meal_dishes, user)
+    ]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [dish["name"] for dish, _ in scored[:top_n]]
+
+
+@pytest.mark.parametrize("target_calories, target_protein", TARGETS)
+def test_table_scores_match_comprehensive_score(
+    dish_filter, target_calories, target_protein
+):
+    table = dish_filter.dish_table(DISHES)
+    rows = np.arange(len(DISHES))
+    for user in USERS:
+        expected = [
+            dish_filter.calculate_comprehensive_score(
+                dish, user, target_calories, target_protein
+            )
+            for dish in DISHES
+        ]
+        scores = table.score(user, rows, target_calories, target_protein)
+        assert scores.tolist() == expected
+
+
+def test_constraint_mask_matches_filter(dish_filter):
+    table = dish_filter.dish_table(DISHES)
+    rows = np.arange(len(DISHES))
+    for user in USERS:
+        allowed = dish_filter.filter_dishes_by_constraints(DISHES, user)
+        mask = table.constraint_mask(user, rows)
+        assert [DISHES[row] for row in rows[mask]] == allowed
+
+
+@pytest.mark.parametrize("top_n", [1, 3, 5, 100])
+@pytest.mark.parametrize("target_calories", [None, 400])
+def test_best_dishes_match_stable_sort(dish_filter, top_n, target_calories):
+    # A filter without a DishTable ranks the same pool dish by dish
+    per_dish_filter = DishFilter()
+    for user, meal_type in itertools.product(USERS, MEAL_TYPES):
+        expected = reference_best_dishes(
+            dish_filter, user, meal_type, target_calories, top_n
+        )
+        for ranking_filter in (dish_filter, per_dish_filter):
+            best = ranking_filter.get_best_dishes_by_meal_type(
+                DISHES, user, meal_type, target_calories, 20.0, top_n
+            )
+            assert [dish["name"] for dish in best] == expected
+
+
+def test_top_rows_keeps_ties_in_row_order():
+    rows = np.array([7, 3, 5, 1, 9, 4])
+    scores = np.array([1.0, 2.0, 2.0, 0.0, 2.0, 1.0])
+
+    assert DishTable.top_rows(rows, scores, 1).tolist() == [3]
+    assert DishTable.top_rows(rows, scores, 2).tolist() == [3, 5]
+    assert DishTable.top_rows(rows, scores, 4).tolist() == [3, 5, 9, 7]
+    assert DishTable.top_rows(rows, scores, 10).tolist() == [3, 5, 9, 7, 4, 1]
+    assert DishTable.top_rows(rows, scores, 0).tolist() == []
+    assert DishTable.top_rows(rows[:0], scores[:0], 1).tolist() == []
+
+
+def test_helpers_leave_dishes_unchanged():
+    dishes = load_menu()
+    user = USERS[-1]
+    dish_filter = DishFilter()
+
+    DishTable(dishes)
+    find_best_dish(dishes, user)
+    dish_filter.filter_dishes_by_constraints(dishes, user)
+    dish_filter.calculate_comprehensive_score(dishes[0], user, 500, 20.0)
+    dish_filter.get_best_dishes_by_meal_type(dishes, user, "lunch", 500, 20.0)
+
+    assert dishes == load_menu()
+
+
+def test_constraints_read_current_dish_tags():
+    dish = dict(DISHES[0], allergy_risks=[])
+    user = {"known_allergies": ["nuts"]}
+    dish_filter = DishFilter()
+
+    assert dish_filter.filter_dishes_by_constraints([dish], user) == [dish]
+    dish["allergy_risks"] = ["nuts"]
+    assert dish_filter.filter_dishes_by_constraints([dish], user) == []
+
+
+def test_user_context_ranks_like_the_profile(dish_filter):
+    table = dish_filter.dish_table(DISHES)
+    lunch_rows = table.rows_for_meal_type("lunch")
+
+    def picks(user):
+        return [
+            table.find_best_dish(user, lunch_rows, rng=random.Random(3)),
+            table.find_best_dishes(user, MEAL_TYPES, rng=random.Random(3)),
+            find_best_dish(DISHES, user, rng=random.Random(3)),
+        ]
+
+    for user in USERS:
+        assert picks(dish_filter.build_user_context(user)) == picks(user)
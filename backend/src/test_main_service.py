@@ -0,0 +1,84 @@
+import pytest
+
+import main_service
+from main_service import MealPlannerService, freeze_user_data
+
+USER = {
+    "weight_kg": 70,
+    "primary_goal": "Weight Loss",
+    "dietary_strictness": "vegetarian",
+    "lifestyle_type": "active",
+    "known_allergies": ["nuts"],
+    "preferred_meal_times": ["morning", "evening"],
+    "persona_tags": ["general"],
+    "Region": "north",
+    "Meal_Frequency": "3 meals + 2 snacks",
+}
+
+
+class FakeGenerator:
+    """Stand-in pipeline echoing each prompt, or failing as configured."""
+
+    def __init__(self, fail=None):
+        self.fail = fail  # None, "error" or "empty"
+        self.calls = []
+
+    def __call__(self, prompts, batch_size=None):
+        self.calls.append(list(prompts))
+        if self.fail == "error":
+            raise RuntimeError("out of memory")
+        text = "" if self.fail == "empty" else None
+        return [
+            {"generated_text": prompt if text is None else text} for prompt in prompts
+        ]
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    generator = FakeGenerator()
+    monkeypatch.setattr(main_service, "get_generator", lambda: generator)
+    monkeypatch.setattr(main_service, "warm_up_generator", lambda *args: None)
+    return generator
+
+
+def test_repeat_request_is_served_from_the_plan_cache(generator):
+    service = MealPlannerService()
+
+    first = service.generate_meal_plan(USER, 2000)
+    second = service.generate_meal_plan(dict(USER), 2000)
+
+    assert second == first
+    assert len(generator.calls) == 1
+    assert service.cache_stats["plan_hits"] == 1
+
+
+@pytest.mark.parametrize("fail", ["error", "empty"])
+def test_failed_generation_is_not_cached(generator, fail):
+    service = MealPlannerService()
+
+    generator.fail = fail
+    failed_plan, _ = service.generate_meal_plan(USER, 2000)
+    generator.fail = None
+    meal_plan, _ = service.generate_meal_plan(USER, 2000)
+
+    assert failed_plan != meal_plan
+    assert len(generator.calls) == 2
+    assert service.cache_stats["plan_hits"] == 0
+    assert service.cache_stats["generation_failures"] == (
+        1 if fail == "error" else len(meal_plan)
+    )
+
+
+def test_same_profile_gets_the_same_plan(generator):
+    plans = [MealPlannerService().generate_meal_plan(USER, 2000) for _ in range(2)]
+
+    assert plans[0] == plans[1]
+    assert len(generator.calls) == 2
+
+
+def test_frozen_profile_ignores_set_and_key_order():
+    user = dict(USER, known_allergies={"nuts", "dairy", "soy"})
+    reordered = dict(reversed(list(user.items())))
+    reordered["known_allergies"] = {"soy", "nuts", "dairy"}
+
+    assert repr(freeze_user_data(user)) == repr(freeze_user_data(reordered))
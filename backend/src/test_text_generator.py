@@ -0,0 +1,74 @@
+import diskcache
+
+from text_generator import DescriptionCache, parse_generated_text
+
+
+class FakeGenerator:
+    """Stand-in pipeline returning queued outputs and recording each batch."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.calls = []
+
+    def __call__(self, prompts, batch_size=None):
+        self.calls.append(list(prompts))
+        return self.batches.pop(0)
+
+
+def test_parse_generated_text():
+    assert parse_generated_text({"generated_text": "  Dal  "}) == "Dal"
+    assert parse_generated_text([{"generated_text": "Dal"}]) == "Dal"
+    assert parse_generated_text({"generated_text": "   "}) == ""
+    assert parse_generated_text([]) == ""
+    assert parse_generated_text(None) == ""
+
+
+def test_cached_prompts_skip_the_generator():
+    cache = DescriptionCache()
+    generator = FakeGenerator([{"generated_text": "Poha"}, {"generated_text": "Dal"}])
+
+    assert cache.generate(generator, {"breakfast": "p1", "lunch": "p2"}) == {
+        "breakfast": "Poha",
+        "lunch": "Dal",
+    }
+    cached, pending = cache.lookup({"breakfast": "p1", "dinner": "p3"})
+
+    assert cached == {"breakfast": "Poha"}
+    assert pending == {"dinner": "p3"}
+    assert len(generator.calls) == 1
+
+
+def test_empty_output_is_not_cached():
+    cache = DescriptionCache()
+    generator = FakeGenerator(
+        [{"generated_text": ""}, {"generated_text": "Dal"}],
+        [{"generated_text": "Poha"}],
+    )
+
+    assert cache.generate(generator, {"breakfast": "p1", "lunch": "p2"}) == {
+        "lunch": "Dal"
+    }
+    cached, pending = cache.lookup({"breakfast": "p1", "lunch": "p2"})
+    assert cached == {"lunch": "Dal"}
+    assert pending == {"breakfast": "p1"}
+
+    assert cache.generate(generator, pending) == {"breakfast": "Poha"}
+    assert generator.calls[-1] == ["p1"]
+
+
+def test_least_recently_used_description_is_evicted():
+    cache = DescriptionCache(maxsize=2)
+    cache.put("p1", "Poha")
+    cache.put("p2", "Dal")
+    cache.get("p1")
+    cache.put("p3", "Kheer")
+
+    assert cache.get("p1") == "Poha"
+    assert cache.get("p2") is None
+
+
+def test_store_serves_other_cache_instances(tmp_path):
+    with diskcache.Cache(str(tmp_path)) as store:
+        DescriptionCache(store=store).put("p1", "Poha")
+
+        assert DescriptionCache(store=store).get("p1") == "Poha"
@@ -0,0 +1,204 @@
+# Text generation model shared by the API and the standalone meal planner
+# File: text_generator.py
+
+import hashlib
+import importlib.util
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from new_prompt_builder import build_prompt
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Text generation model used for meal descriptions
+AI_MODEL_NAME = "MBZUAI/LaMini-Flan-T5-783M"
+
+# Maximum number of generated meal descriptions kept in memory
+DESCRIPTION_CACHE_SIZE = 4096
+
+# Largest batch a single meal plan sends to the model (3 meals + 2 snacks)
+MAX_MEALS_PER_PLAN = 5
+
+
+def load_generator():
+    """
+    Load the text2text generation pipeline with greedy, KV-cached decoding:
+    8-bit weights on CUDA when bitsandbytes is installed, bfloat16 otherwise.
+    """
+    # Imported here so modules load quickly when no model is needed
+    import torch
+    from transformers import (
+        AutoModelForSeq2SeqLM,
+        AutoTokenizer,
+        BitsAndBytesConfig,
+        pipeline,
+    )
+
+    load_kwargs = {"use_cache": True, "low_cpu_mem_usage": True}
+    if torch.cuda.is_available() and importlib.util.find_spec("bitsandbytes"):
+        # 8-bit weights quarter the memory moved per generated token
+        load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+        load_kwargs["device_map"] = "auto"
+        device = None  # Placement is handled by device_map
+    else:
+        # bfloat16 halves the memory moved per generated token
+        load_kwargs["torch_dtype"] = torch.bfloat16
+        device = 0 if torch.cuda.is_available() else -1
+
+    tokenizer = AutoTokenizer.from_pretrained(AI_MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(AI_MODEL_NAME, **load_kwargs)
+
+    # Greedy decoding that reuses cached keys/values between tokens
+    model.generation_config.use_cache = True
+    model.generation_config.do_sample = False
+    model.generation_config.num_beams = 1
+
+    # On GPU, a fixed-size KV cache keeps decoder shapes static so one
+    # compiled graph serves every generated token
+    if torch.cuda.is_available() and device is not None:
+        model.generation_config.cache_implementation = "static"
+        model.forward = torch.compile(
+            model.forward, mode="reduce-overhead", fullgraph=False
+        )
+
+    return pipeline(
+        "text2text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        device=device,
+        max_new_tokens=150,
+        truncation=True,
+    )
+
+
+def warm_up_generator(generator, dishes: List[Dict]):
+    """Run throwaway generations so lazy initialization happens at startup."""
+    # A short prompt plus a full-length one built from a real dish
+    prompts = ["Describe a healthy Indian breakfast."]
+    if dishes:
+        prompts.append(build_prompt({}, "breakfast", 500, dishes[0]))
+
+    if generator.model.generation_config.cache_implementation != "static":
+        generator(prompts, batch_size=len(prompts), max_new_tokens=8)
+        return
+
+    # Compiled graphs specialize on input shapes, so cover every batch size a
+    # day's plan can send (partial cache hits leave 1 to 5 meals) at both
+    # prompt lengths. Other padded prompt lengths still compile on the first
+    # request that produces them. The static cache is sized by max_new_tokens,
+    # which must therefore stay at its default
+    for prompt in prompts:
+        for batch_size in range(1, MAX_MEALS_PER_PLAN + 1):
+            generator([prompt] * batch_size, batch_size=batch_size)
+
+
+def parse_generated_text(model_output) -> str:
+    """Get the stripped text of one pipeline output, or "" when it holds none."""
+    # Pipelines unwrap single-sequence results, but tolerate nested lists
+    if isinstance(model_output, list):
+        model_output = model_output[0] if model_output else {}
+
+    if isinstance(model_output, dict):
+        return model_output.get("generated_text", "").strip()
+    return ""
+
+
+class DescriptionCache:
+    """
+    Thread-safe LRU of generated descriptions keyed by a hash of the model name
+    and prompt, optionally backed by a persistent store (such as a
+    diskcache.Cache) shared across restarts and workers.
+    """
+
+    def __init__(self, maxsize: int = DESCRIPTION_CACHE_SIZE, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self.stats = Counter()  # hits and misses
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        """Hash the model name and the full prompt into a cache key."""
+        digest = hashlib.blake2b(AI_MODEL_NAME.encode("utf-8"), digest_size=16)
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Look up a description in memory first, then in the persistent store."""
+        key = self.key(prompt)
+        with self._lock:
+            description = self._entries.get(key)
+            if description is not None:
+                self._entries.move_to_end(key)
+
+        if description is None and self.store is not None:
+            try:
+                description = self.store.get(key)
+            except Exception as e:
+                logger.warning(f"Failed to read description cache: {e}")
+            if description:
+                self._remember(key, description)
+
+        with self._lock:
+            self.stats["hits" if description else "misses"] += 1
+        return description or None
+
+    def put(self, prompt: str, description: str):
+        """Store a description in memory and in the persistent store."""
+        key = self.key(prompt)
+        self._remember(key, description)
+
+        if self.store is not None:
+            try:
+                self.store.set(key, description)
+            except Exception as e:
+                logger.warning(f"Failed to write description cache: {e}")
+
+    def _remember(self, key: str, description: str):
+        """Keep a description in memory, evicting the least recently used one."""
+        with self._lock:
+            self._entries[key] = description
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def lookup(self, prompts: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Split meal prompts (meal name -> prompt) into the descriptions already
+        cached and the prompts still to generate.
+        """
+        cached = {}
+        pending = {}
+        for meal_name, prompt in prompts.items():
+            description = self.get(prompt)
+            if description:
+                cached[meal_name] = description
+            else:
+                pending[meal_name] = prompt
+        return cached, pending
+
+    def generate(self, generator, prompts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Describe meals (meal name -> prompt) in one batched model call, caching
+        and returning only non-empty descriptions. Generator errors propagate.
+        """
+        if not prompts:
+            return {}
+
+        logger.info(f"Generating AI meal descriptions for {len(prompts)} meals")
+        model_outputs = generator(list(prompts.values()), batch_size=len(prompts))
+
+        descriptions = {}
+        for (meal_name, prompt), model_output in zip(prompts.items(), model_outputs):
+            description = parse_generated_text(model_output)
+            if description:
+                self.put(prompt, description)
+                descriptions[meal_name] = description
+            else:
+                logger.warning(f"AI model returned no valid output for {meal_name}")
+        return descriptions